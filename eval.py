@@ -12,7 +12,7 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from statistics import mean
 
-from fx.data import load_cache, get_current_rate
+from fx.data import get_current_rate, get_store
 
 
 LOG_FILE = Path("logs.jsonl")
@@ -37,10 +37,10 @@ def load_predictions(days=None):
 
 
 def get_historical_rate(target_date):
-    cache = load_cache()
     key = f"{target_date}_inr_aud"
-    if key in cache:
-        return cache[key]
+    rate = get_store().get(key)
+    if rate is not None:
+        return rate
     try:
         return get_current_rate(base="inr", target="aud", date=target_date)
     except:
@@ -111,53 +111,95 @@ def run_eval(days=None, verbose=False):
     return m
 
 
-def run_backtest(interval=2):
-    import math
-    from statistics import mean
-    from fx.analysis import compute_moving_average, compute_rsi, compute_bollinger_position
-    from fx.sim import monte_carlo_simulation
+def run_backtest(interval=2, simulations=1000, seed=None, workers=None):
+    import numpy as np
+    from fx.rolling import bollinger_position_series, rolling_indicators, rolling_mean, rsi_series
+    from fx.sim import make_rng, simulate_terminal_rates
+    from fx.parallel import parallel_forecast_many
+    from fx.series import open_series
 
     print(f"\n{'='*50}")
     print("BACKTESTING IMPROVED MODEL")
     print(f"{'='*50}")
 
-    cache = load_cache()
-    dates = sorted([datetime.strptime(k.split("_")[0], "%Y-%m-%d").date() for k in cache.keys() if k.endswith("_inr_aud")])
-    print(f"Data: {len(dates)} days ({dates[0]} to {dates[-1]})")
+    # One indexed range read instead of parsing every cache key
+    rows = get_store().get_range("inr", "aud")
+    latest = datetime.strptime(rows[-1][0], "%Y-%m-%d").date() if rows else None
+    series = open_series("inr", "aud")
+    end = latest or (series.last_day if series is not None else None)
+    if series is not None and series.covers(series.first_day, end):
+        # Exported memory-mapped series (python -m fx.series), read in place
+        # up to the store's last day; NaN = missing day
+        values = series.window(series.first_day, end)
+        present = ~np.isnan(values)
+        rates = values if present.all() else values[present]
+        offsets = np.flatnonzero(present)
+
+        def day(k):
+            return series.first_day + timedelta(days=int(offsets[k]))
+    else:
+        if series is not None:
+            print("Series file is behind the rate store, using the store (re-export: python -m fx.series --pair inr:aud)")
+        rates = np.array([rate for _, rate in rows])
+
+        def day(k):
+            return datetime.strptime(rows[k][0], "%Y-%m-%d").date()
 
-    if len(dates) < 48:
+    if not len(rates):
         print("Need more data")
         return calc_metrics([])
+    print(f"Data: {len(rates)} days ({day(0)} to {day(len(rates) - 1)})")
+
+    if len(rates) < 48:
+        print("Need more data (fill the cache with: python -m fx.backfill --pair inr:aud --from YYYY-MM-DD)")
+        return calc_metrics([])
 
-    rate_map = {d: cache[f"{d.strftime('%Y-%m-%d')}_inr_aud"] for d in dates}
     results = []
+    rng = make_rng(seed)
+    windows = []
+
+    # Every indicator is computed once over the whole series; a prediction
+    # on day i reads index t = i - 1, the last day of its 40-day history.
+    indicators = rolling_indicators(rates, ma_windows=(7, 30), std_window=30, slope_lag=7)
+    # log_returns[k] is day k -> k+1, so the 39 returns inside a 40-day
+    # window ending at t are log_returns[t-39 .. t-1]
+    drifts = rolling_mean(np.diff(np.log(rates)), 39)
+    rsis = rsi_series(rates)
+    bbs = bollinger_position_series(rates)
 
     # Make predictions every 'interval' days, starting after we have 40 days of data
-    for i in range(40, len(dates) - 7, interval):
-        # Get 40 days of history
-        hist = [rate_map[dates[j]] for j in range(i - 40, i)]
-        if len(hist) < 40:
-            continue
-
-        current = hist[-1]
-        pred_date = dates[i]
-
-        # Calculate features
-        log_returns = [math.log(hist[j] / hist[j-1]) for j in range(1, len(hist))]
-        drift = mean(log_returns)
-        vol = (sum((x - drift) ** 2 for x in log_returns) / len(log_returns)) ** 0.5
-
-        ma7 = compute_moving_average(hist, 7)[-1]
-        ma30 = compute_moving_average(hist, 30)[-1]
-        momentum = current - ma7
-        slope = hist[-1] - hist[-8]
-        vol = (sum((x - mean(hist[-30:])) ** 2 for x in hist[-30:]) / 30) ** 0.5
-        rsi = compute_rsi(hist)
-        bb = compute_bollinger_position(current, hist)
-
-        # Monte Carlo
-        fcst = monte_carlo_simulation(current, drift, vol, days=7)
-        prob_mc = sum(1 for x in fcst if x > current) / len(fcst)
+    for i in range(40, len(rates) - 7, interval):
+        t = i - 1
+        windows.append((
+            i,
+            float(rates[t]),
+            float(drifts[t - 1]),
+            float(indicators["std_30"][t]),
+            float(indicators["ma_30"][t]),
+            float(indicators["momentum"][t]),
+            float(indicators["slope"][t]),
+            float(rsis[t]),
+            float(bbs[t]),
+        ))
+
+    # Monte Carlo: one batch across all dates when a process pool is requested
+    if workers:
+        estimates = parallel_forecast_many(
+            [(current, drift, vol) for _, current, drift, vol, *_ in windows],
+            days=7,
+            simulations=simulations,
+            workers=workers,
+            seed=seed,
+        )
+        mc_probs = [e["prob_up"] for e in estimates]
+    else:
+        mc_probs = []
+        for _, current, drift, vol, *_ in windows:
+            fcst = simulate_terminal_rates(current, drift, vol, days=7, simulations=simulations, seed=rng)
+            mc_probs.append(float((fcst > current).mean()))
+
+    for (i, current, drift, vol, ma30, momentum, slope, rsi, bb), prob_mc in zip(windows, mc_probs):
+        pred_date = day(i)
 
         # Mean reversion
         mr = 0.5
@@ -187,7 +229,7 @@ def run_backtest(interval=2):
         prob = 0.20*prob_mc + 0.25*mr + 0.15*mom + 0.15*tr + 0.15*rsi_prob + 0.10*bb_prob
 
         # Get actual 7 days later
-        actual = rate_map[dates[i + 7]]
+        actual = float(rates[i + 7])
 
         pred_dir = "up" if prob > 0.5 else "down"
         actual_dir = "up" if actual > current else "down"
@@ -224,10 +266,13 @@ def main():
     parser.add_argument("-v", "--verbose", action="store_true")
     parser.add_argument("--backtest", action="store_true")
     parser.add_argument("--interval", type=int, default=2)
+    parser.add_argument("--simulations", type=int, default=1000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int)
     args = parser.parse_args()
 
     if args.backtest:
-        run_backtest(args.interval)
+        run_backtest(args.interval, args.simulations, args.seed, args.workers)
     else:
         run_eval(args.days, args.verbose)
 
@@ -1,20 +1,52 @@
 # ===============================
 # ANALYSIS
 # ===============================
-import math
-from statistics import mean
+import datetime
+import os
 
-from .sim import monte_carlo_simulation
-from .data import get_current_rate, get_historical_rates
+import numpy as np
+
+from .analytic import analytic_forecast, analytic_forecast_many
+from .forecast import ForecastSummary
+from .horizon import best_send_day, forecast_curve
+from .memo import LRUCache, rate_bucket
+from .parallel import parallel_forecast
+from .sim import adaptive_forecast, forecast_estimates
+from .data import get_current_rate, get_current_rates, get_historical_matrix, get_historical_rates
 from .risk import risk_band_analysis
+from .rolling import (
+    log_return_stats,
+    rolling_indicators,
+    rolling_mean,
+    rsi_series,
+)
 
 def compute_moving_average(rates, window):
     if len(rates) < window:
         raise ValueError(f"Need {window} days of data, but only have {len(rates)}.")
-    return [mean(rates[i : i + window]) for i in range(len(rates) - window + 1)]
+    return rolling_mean(rates, window)[window - 1 :].tolist()
+
+def compute_rsi(rates, period=14):
+    if len(rates) <= period:
+        raise ValueError(f"Need {period + 1} days of data, but only have {len(rates)}.")
+    return float(rsi_series(rates, period)[-1])
+
+def compute_bollinger_position(current_rate, rates, window=20, num_std=2.0):
+    # Position of current_rate inside the band built from the last `window` rates
+    if len(rates) < window:
+        raise ValueError(f"Need {window} days of data, but only have {len(rates)}.")
+    recent = np.asarray(rates[-window:], dtype=float)
+    mid = float(recent.mean())
+    width = 2 * num_std * float(recent.std())
+    if width == 0:
+        return 0.5
+    return float(np.clip((current_rate - (mid - width / 2)) / width, 0.0, 1.0))
 
-def scenario_comparison(current_rate, forecast_results, amount_aud=1000):
-    expected_rate = sum(forecast_results) / len(forecast_results)
+def scenario_comparison(current_rate, forecast_results, amount_aud=1000, expected_rate=None):
+    if expected_rate is None and isinstance(forecast_results, ForecastSummary):
+        expected_rate = forecast_results.mean
+    elif expected_rate is None:
+        expected_rate = float(np.mean(forecast_results))
 
     inr_today = amount_aud * current_rate
     inr_expected = amount_aud * expected_rate
@@ -28,67 +60,220 @@ def scenario_comparison(current_rate, forecast_results, amount_aud=1000):
         "difference": round(difference, 2),
     }
 
-def analyze_fx():
-    current_rate = get_current_rate()
-    # Fetch 40 days to ensure we have enough for a 30-day window
-    historical_data = get_historical_rates(days=40)
-
-    # Convert rates into log returns
-    log_returns = [
-        math.log(historical_data[i] / historical_data[i - 1])
-        for i in range(1, len(historical_data))
-    ]
-    drift = mean(log_returns)
-    volatility = (
-        sum((x - drift) ** 2 for x in log_returns) / len(log_returns)
-    ) ** 0.5  # stdev of log returns
-
-    # Calculate Moving Avgs
-    ma7_list = compute_moving_average(historical_data, window=7)
-    ma30_list = compute_moving_average(historical_data, window=30)
-
-    # Get the latest values from the lists
-    latest_ma7 = ma7_list[-1]
-    latest_ma30 = ma30_list[-1]
+# Set FX_MEMO_DIR to keep memoized features/results across sessions
+_MEMO_DIR = os.getenv("FX_MEMO_DIR")
+feature_cache = LRUCache(
+    maxsize=64, path=os.path.join(_MEMO_DIR, "fx_features.pkl") if _MEMO_DIR else None
+)
+result_cache = LRUCache(
+    maxsize=256, path=os.path.join(_MEMO_DIR, "fx_results.pkl") if _MEMO_DIR else None
+)
 
-    # Momentum
-    momentum = current_rate - latest_ma7
-
-    # Trend slope (last 7 days)
-    slope = historical_data[-1] - historical_data[-8]
+def compute_features(base="inr", target="aud", days=40):
+    """
+    History-derived inputs for analyze_fx, memoized per pair and day since
+    the history only changes once a day. A window with gaps (a day failed
+    to fetch) is used but not memoized, so the next call retries the fetch.
+    """
+    key = (base, target, datetime.date.today().isoformat(), days)
+    features = feature_cache.get(key)
+    if features is not None:
+        return features
 
-    # Volatility (std dev of last 30 days)
-    volatility = (
-        sum((x - mean(historical_data[-30:])) ** 2 for x in historical_data[-30:]) / 30
-    ) ** 0.5
+    # Fetch 40 days to ensure we have enough for a 30-day window
+    historical_data = get_historical_rates(base=base, target=target, days=days)
 
-    forecast7d = monte_carlo_simulation(current_rate, drift, volatility, days=7)
-    scenario = scenario_comparison(current_rate, forecast7d, amount_aud=1000)
+    if len(historical_data) < 30:
+        raise ValueError(f"Need 30 days of data, but only have {len(historical_data)}.")
 
-    expected_future = mean(forecast7d)
-    prob_up = sum(1 for x in forecast7d if x > current_rate) / len(forecast7d)
+    # Drift of log returns
+    drift, _ = log_return_stats(historical_data)
 
-    # Risk band analysis
-    risk_band_confidence = risk_band_analysis(forecast7d, current_rate)
+    # Moving averages, 30-day std and slope in one pass over the series
+    indicators = rolling_indicators(historical_data, ma_windows=(7, 30), std_window=30, slope_lag=7)
 
-    # Decision Logic
+    features = {
+        "drift": drift,
+        "ma_7": float(indicators["ma_7"][-1]),
+        "ma_30": float(indicators["ma_30"][-1]),
+        # Trend slope (last 7 days)
+        "slope": float(indicators["slope"][-1]),
+        # Volatility (std dev of last 30 days)
+        "volatility": float(indicators["std_30"][-1]),
+        "ma_7_series": indicators["ma_7"],
+        "ma_30_series": indicators["ma_30"],
+    }
+    if len(historical_data) == days:
+        feature_cache.put(key, features)
+    return features
 
+def decide(prob_up):
     if prob_up > 0.6:
-        decision = "wait (expected improvement)"
+        return "wait (expected improvement)"
     elif prob_up < 0.4:
-        decision = "send now (expected decline)"
-    else:
-        decision = "neutral"
+        return "send now (expected decline)"
+    return "neutral"
 
+def risk_level(risk_band_confidence):
     if risk_band_confidence < 0.5:
-        risk = "high volatility (low confidence)"
+        return "high volatility (low confidence)"
     elif risk_band_confidence < 0.75:
-        risk = "moderate volatility (medium confidence)"
+        return "moderate volatility (medium confidence)"
+    return "low volatility (higher confidence)"
+
+# 500 to 50,000 AUD
+DEFAULT_SWEEP_AMOUNTS = (500, 1000, 2000, 5000, 10_000, 20_000, 50_000)
+
+def scenario_sweep(current_rate, forecast, amounts=DEFAULT_SWEEP_AMOUNTS, quantiles=(0.05, 0.95)):
+    """
+    scenario_comparison for a whole vector of amounts. The forecast (a
+    ForecastSummary or an array of terminal rates) is reduced once to a
+    mean and a few quantiles, then every amount is a single multiply.
+    Returns a dict of arrays aligned with `amounts`; "p5"/"p95" style keys
+    hold the quantile outcomes and are left out for any quantile the
+    summary does not carry.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    if isinstance(forecast, ForecastSummary):
+        expected_rate = forecast.mean
+        quantiles = [q for q in quantiles if q in forecast.quantiles]
+        rate_quantiles = [forecast.quantiles[q] for q in quantiles]
+    else:
+        forecast = np.asarray(forecast, dtype=float)
+        expected_rate = float(forecast.mean())
+        rate_quantiles = np.quantile(forecast, quantiles)
+
+    table = {
+        "amount": amounts,
+        "today": amounts * current_rate,
+        "expected": amounts * expected_rate,
+    }
+    table["difference"] = table["expected"] - table["today"]
+    outcomes = np.outer(amounts, rate_quantiles)
+    for i, q in enumerate(quantiles):
+        table[f"p{round(q * 100):g}"] = outcomes[:, i]
+    return table
+
+def analyze_fx(
+    simulations=None,
+    seed=None,
+    method="plain",
+    engine="analytic",
+    tolerance=0.01,
+    max_simulations=100_000,
+    workers=None,
+    keep_paths=False,
+    histogram_bins=None,
+    base="inr",
+    target="aud",
+    memoize=True,
+):
+    if engine == "analytic":
+        # The closed form draws no paths, so these would be silently ignored
+        ignored = [name for name, value in (("simulations", simulations), ("seed", seed), ("workers", workers))
+                   if value is not None]
+        if method != "plain":
+            ignored.append("method")
+        if ignored:
+            raise ValueError(
+                f"engine='analytic' does not simulate; {', '.join(ignored)} need engine='fixed' or 'adaptive'."
+            )
+    simulations = 1000 if simulations is None else simulations
+
+    current_rate = get_current_rate(base=base, target=target)
+    # workers picks the sharded engine, whose RNG streams (and supported
+    # methods) differ from the serial one; the worker count itself does not
+    # change the answer
+    engine_path = "parallel" if engine == "fixed" and workers else engine
+
+    # Same pair, same day, same rate bucket and same parameters -> same answer
+    memo_key = (
+        base,
+        target,
+        datetime.date.today().isoformat(),
+        rate_bucket(current_rate),
+        engine_path,
+        method,
+        simulations,
+        seed,
+        tolerance,
+        max_simulations,
+        keep_paths,
+        # Bin edges may arrive as a list or array; keys must be hashable
+        histogram_bins
+        if histogram_bins is None or isinstance(histogram_bins, (int, str))
+        else tuple(np.asarray(histogram_bins, dtype=float).tolist()),
+    )
+    if memoize:
+        cached = result_cache.get(memo_key)
+        if cached is not None:
+            # Shallow copy: callers add keys (e.g. "confidence") to the result
+            return dict(cached)
+
+    features = compute_features(base=base, target=target, days=40)
+    drift = features["drift"]
+    volatility = features["volatility"]
+    latest_ma7 = features["ma_7"]
+    latest_ma30 = features["ma_30"]
+    slope = features["slope"]
+
+    # Momentum
+    momentum = current_rate - latest_ma7
+
+    # GBM has a closed form, so "analytic" is exact and the default;
+    # the simulation engines stay for checking it and for richer models
+    if engine == "analytic":
+        estimates = analytic_forecast(current_rate, drift, volatility, days=7)
+    elif engine == "adaptive":
+        # Easy cases stop after the first chunk; close calls run up to the cap
+        estimates = adaptive_forecast(
+            current_rate,
+            drift,
+            volatility,
+            days=7,
+            tolerance=tolerance,
+            max_simulations=max_simulations,
+            seed=seed,
+            method=method,
+            keep_paths=keep_paths,
+        )
+    elif engine_path == "parallel":
+        estimates = parallel_forecast(
+            current_rate,
+            drift,
+            volatility,
+            days=7,
+            simulations=simulations,
+            workers=workers,
+            seed=seed,
+            method=method,
+        )
+    elif engine == "fixed":
+        estimates = forecast_estimates(
+            current_rate, drift, volatility, days=7, simulations=simulations, seed=seed, method=method
+        )
     else:
-        risk = "low volatility (higher confidence)"
+        raise ValueError(f"Unknown forecast engine '{engine}'.")
+
+    # Reduce the engine output once; nothing below rescans the paths
+    forecast = ForecastSummary.from_estimates(
+        estimates, current_rate, band=0.02, bins=histogram_bins, keep_paths=keep_paths
+    )
+
+    expected_future = forecast.mean
+    prob_up = forecast.prob_up
+    scenario = scenario_comparison(current_rate, forecast, amount_aud=1000)
+    scenario_table = scenario_sweep(current_rate, forecast)
+
+    # Risk band analysis (probability of ending within +/-2% of today)
+    risk_band_confidence = risk_band_analysis(forecast, current_rate)
+
+    # Decision Logic
+    decision = decide(prob_up)
+    risk = risk_level(risk_band_confidence)
 
     # IMPORTANT: These keys must match generate_response exactly
-    return {
+    result = {
         "current_rate": current_rate,
         "ma_7": latest_ma7,
         "ma_30": latest_ma30,
@@ -97,10 +282,102 @@ def analyze_fx():
         "volatility": volatility,
         "decision": decision,
         "prob_up": prob_up,
+        "prob_up_se": forecast.standard_errors["prob_up"],
         "drift": drift,
         "risk_band_confidence": risk_band_confidence,
+        "risk_band_se": forecast.standard_errors["band"],
         "risk": risk,
-        "forecast7d": forecast7d,
+        "forecast": forecast,
+        # Raw paths only when asked for (keep_paths=True) with a simulating engine
+        "forecast7d": forecast.paths.tolist() if forecast.paths is not None else None,
         "expected_7d": expected_future,
+        "expected_7d_se": forecast.standard_errors["mean"],
+        "sim_method": forecast.method,
+        "simulations": forecast.simulations,
         "scenario": scenario,
-    }
\ No newline at end of file
+        "scenario_table": scenario_table,
+    }
+    if memoize:
+        result_cache.put(memo_key, result)
+    return dict(result)
+
+def analyze_fx_many(pairs, horizon=7, amount=1000):
+    """
+    analyze_fx for many (base, target) pairs at once: one batched fetch, a
+    pairs x dates matrix, and indicators plus the closed-form forecast
+    computed for every pair in the same array operations.
+    Returns {"base:target": result}.
+    """
+    pairs = [(base.lower(), target.lower()) for base, target in pairs]
+    current = get_current_rates(pairs)
+    _, history = get_historical_matrix(pairs, days=40)
+
+    # Drift over the returns we actually have: forward-fill leaves leading
+    # NaNs for late-listed pairs, which would otherwise make drift NaN
+    log_returns = np.diff(np.log(history), axis=-1)
+    valid = ~np.isnan(log_returns)
+    drift = np.where(valid, log_returns, 0.0).sum(axis=-1) / np.maximum(valid.sum(axis=-1), 1)
+    # Only the latest values are used, and those need just the last 30
+    # days; prefix sums would carry an earlier NaN into every window
+    indicators = rolling_indicators(history[:, -30:], ma_windows=(7, 30), std_window=30, slope_lag=7)
+    ma7 = indicators["ma_7"][:, -1]
+    ma30 = indicators["ma_30"][:, -1]
+    volatility = indicators["std_30"][:, -1]
+    forecast = analytic_forecast_many(current, drift, volatility, days=horizon, band=0.02)
+
+    today = amount * current
+    expected = amount * forecast["expected"]
+    # Pairs whose last 30 days are incomplete cannot be analysed
+    complete = ~np.isnan(history[:, -30:]).any(axis=1)
+
+    results = {}
+    for i, (base, target) in enumerate(pairs):
+        name = f"{base}:{target}"
+        if not complete[i]:
+            results[name] = {"error": "Need 30 days of data for this pair."}
+            continue
+        results[name] = {
+            "current_rate": float(current[i]),
+            "ma_7": float(ma7[i]),
+            "ma_30": float(ma30[i]),
+            "momentum": float(current[i] - ma7[i]),
+            "slope": float(indicators["slope"][i, -1]),
+            "volatility": float(volatility[i]),
+            "drift": float(drift[i]),
+            "horizon": horizon,
+            "prob_up": float(forecast["prob_up"][i]),
+            "decision": decide(forecast["prob_up"][i]),
+            "risk_band_confidence": float(forecast["band_prob"][i]),
+            "risk": risk_level(forecast["band_prob"][i]),
+            "expected_rate": float(forecast["expected"][i]),
+            "scenario": {
+                "amount": amount,
+                "today": round(float(today[i]), 2),
+                "expected": round(float(expected[i]), 2),
+                "difference": round(float(expected[i] - today[i]), 2),
+            },
+        }
+    return results
+
+def analyze_send_day(
+    horizon=30, simulations=10_000, seed=None, risk_aversion=1.0, base="inr", target="aud"
+):
+    """
+    "Which day in the next `horizon` days is best?" from one simulation:
+    the per-day forecast curve plus the best expected and risk-adjusted day.
+    """
+    current_rate = get_current_rate(base=base, target=target)
+    features = compute_features(base=base, target=target, days=40)
+    curve = forecast_curve(
+        current_rate,
+        features["drift"],
+        features["volatility"],
+        horizon=horizon,
+        simulations=simulations,
+        seed=seed,
+    )
+    return {
+        "current_rate": current_rate,
+        "curve": curve,
+        **best_send_day(curve, risk_aversion=risk_aversion),
+    }
@@ -0,0 +1,116 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+# ===============================
+# CLOSED-FORM GBM FORECAST
+# ===============================
+# Under the model in fx/sim.py the horizon log-return is a sum of `days`
+# i.i.d. N(drift, volatility^2) shocks, so S_T / S_0 is lognormal with
+# mu = days * drift and sigma = volatility * sqrt(days).
+
+_STD_NORMAL = NormalDist()
+
+
+def gbm_log_params(drift, volatility, days):
+    return days * drift, volatility * math.sqrt(days)
+
+
+def _log_cdf(x, mu, sigma):
+    # P(log-return <= x); a zero-volatility model is a point mass at mu
+    if sigma == 0:
+        return 1.0 if x >= mu else 0.0
+    return _STD_NORMAL.cdf((x - mu) / sigma)
+
+
+def gbm_expected_rate(current_rate, drift, volatility, days):
+    mu, sigma = gbm_log_params(drift, volatility, days)
+    return current_rate * math.exp(mu + 0.5 * sigma**2)
+
+
+def gbm_std_rate(current_rate, drift, volatility, days):
+    mu, sigma = gbm_log_params(drift, volatility, days)
+    return current_rate * math.exp(mu + 0.5 * sigma**2) * math.sqrt(math.expm1(sigma**2))
+
+
+def gbm_prob_up(drift, volatility, days):
+    mu, sigma = gbm_log_params(drift, volatility, days)
+    if sigma == 0:
+        return 1.0 if mu > 0 else 0.0
+    return 1.0 - _log_cdf(0.0, mu, sigma)
+
+
+def gbm_band_probability(drift, volatility, days, band=0.02):
+    # P((1 - band) * S_0 <= S_T <= (1 + band) * S_0)
+    mu, sigma = gbm_log_params(drift, volatility, days)
+    lower, upper = math.log(1 - band), math.log(1 + band)
+    if sigma == 0:
+        return 1.0 if lower <= mu <= upper else 0.0
+    return _log_cdf(upper, mu, sigma) - _log_cdf(lower, mu, sigma)
+
+
+def gbm_quantile(current_rate, drift, volatility, days, q):
+    mu, sigma = gbm_log_params(drift, volatility, days)
+    if sigma == 0:
+        return current_rate * math.exp(mu)
+    return current_rate * math.exp(mu + sigma * _STD_NORMAL.inv_cdf(q))
+
+
+def analytic_forecast(
+    current_rate, drift, volatility, days=7, band=0.02, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)
+):
+    """
+    Exact GBM forecast with the same keys as fx.sim.forecast_estimates.
+    Standard errors are zero because nothing is sampled.
+    """
+    return {
+        "method": "analytic",
+        "simulations": 0,
+        "prob_up": gbm_prob_up(drift, volatility, days),
+        "prob_up_se": 0.0,
+        "band_prob": gbm_band_probability(drift, volatility, days, band=band),
+        "band_prob_se": 0.0,
+        "expected": gbm_expected_rate(current_rate, drift, volatility, days),
+        "expected_se": 0.0,
+        "std": gbm_std_rate(current_rate, drift, volatility, days),
+        "quantiles": {
+            q: gbm_quantile(current_rate, drift, volatility, days, q) for q in quantiles
+        },
+        "terminal": None,
+    }
+
+
+def _normal_cdf_array(x):
+    try:
+        from scipy.special import ndtr
+    except ImportError:
+        return np.vectorize(_STD_NORMAL.cdf, otypes=[float])(x)
+    return ndtr(x)
+
+
+def analytic_forecast_many(current_rates, drifts, volatilities, days=7, band=0.02):
+    """
+    analytic_forecast over arrays of pairs at once. Returns a dict of
+    arrays (prob_up, band_prob, expected, std), one entry per pair.
+    """
+    current_rates = np.asarray(current_rates, dtype=float)
+    mu = days * np.asarray(drifts, dtype=float)
+    sigma = np.sqrt(days) * np.asarray(volatilities, dtype=float)
+    lower, upper = math.log(1 - band), math.log(1 + band)
+
+    safe_sigma = np.where(sigma > 0, sigma, 1.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prob_up = np.where(sigma > 0, 1.0 - _normal_cdf_array(-mu / safe_sigma), (mu > 0).astype(float))
+        band_prob = np.where(
+            sigma > 0,
+            _normal_cdf_array((upper - mu) / safe_sigma) - _normal_cdf_array((lower - mu) / safe_sigma),
+            ((lower <= mu) & (mu <= upper)).astype(float),
+        )
+    expected = current_rates * np.exp(mu + 0.5 * sigma**2)
+    return {
+        "prob_up": prob_up,
+        "band_prob": band_prob,
+        "expected": expected,
+        "std": expected * np.sqrt(np.expm1(sigma**2)),
+    }
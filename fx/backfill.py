@@ -0,0 +1,107 @@
+"""
+fx/backfill.py - Bulk cache backfill / gap repair for FX history
+
+Usage:
+    python -m fx.backfill --pair inr:aud --from 2023-01-01
+    python -m fx.backfill --pair inr:aud --from 2023-01-01 --to 2023-12-31 --rate 10
+    python -m fx.backfill --pair inr:aud --from 2023-01-01 --export-series
+"""
+
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+from .data import fetch_rates_concurrently, get_store
+from .series import export_series
+from .store import make_key
+
+
+def missing_dates(base, target, start, end):
+    # Every calendar day in [start, end] the store has no rate for
+    have = {d for d, _ in get_store().get_range(base, target, start.isoformat(), end.isoformat())}
+    days = (end - start).days + 1
+    wanted = (start + timedelta(days=i) for i in range(days))
+    return [d.isoformat() for d in wanted if d.isoformat() not in have]
+
+
+def backfill(base, target, start, end=None, batch_size=50, rate_limit=10.0, workers=8):
+    """
+    Fetches missing dates in batches, persisting each batch before the next,
+    so an interrupted run resumes where it stopped. `rate_limit` caps
+    requests per second across the whole run.
+    """
+    end = end or (date.today() - timedelta(days=1))
+    todo = missing_dates(base, target, start, end)
+    print(f"{base}->{target}: {len(todo)} missing days between {start} and {end}")
+
+    store = get_store()
+    fetched = failed = 0
+    started = time.time()
+    try:
+        for i in range(0, len(todo), batch_size):
+            batch = todo[i : i + batch_size]
+            batch_start = time.time()
+
+            rates, errors = fetch_rates_concurrently(base, target, batch, max_workers=workers)
+            store.put_many({make_key(d, base, target): r for d, r in rates.items()})
+            fetched += len(rates)
+            failed += len(errors)
+
+            # Rate limit: a batch may not finish faster than len(batch) / rate_limit
+            if rate_limit:
+                time.sleep(max(0.0, len(batch) / rate_limit - (time.time() - batch_start)))
+
+            elapsed = time.time() - started
+            print(
+                f"  {min(i + batch_size, len(todo))}/{len(todo)} dates"
+                f" | ok {fetched} failed {failed}"
+                f" | {fetched / elapsed if elapsed else 0:.1f} rates/s"
+            )
+    except KeyboardInterrupt:
+        print("Interrupted; completed batches are saved. Re-run to resume.")
+    finally:
+        store.flush()
+
+    elapsed = time.time() - started
+    summary = {
+        "missing": len(todo),
+        "fetched": fetched,
+        "failed": failed,
+        "seconds": round(elapsed, 2),
+        "rates_per_second": round(fetched / elapsed, 2) if elapsed else 0.0,
+    }
+    print(f"Done: {summary}")
+    return summary
+
+
+def _parse_date(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the FX rate cache")
+    parser.add_argument("--pair", default="inr:aud", help="base:target, e.g. inr:aud")
+    parser.add_argument("--from", dest="start", type=_parse_date, required=True)
+    parser.add_argument("--to", dest="end", type=_parse_date)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=10.0, help="max requests per second")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--export-series", action="store_true", help="also write the mmap series file")
+    args = parser.parse_args()
+
+    base, target = args.pair.lower().split(":")
+    backfill(
+        base,
+        target,
+        args.start,
+        args.end,
+        batch_size=args.batch_size,
+        rate_limit=args.rate,
+        workers=args.workers,
+    )
+    if args.export_series:
+        export_series(base, target)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
-import requests
 import datetime
-import json
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import numpy as np
+
+from .http import CircuitBreaker, get_json, make_session
+from .latest import LatestRateCache
+from .series import open_series
+from .store import RateStore, make_key
+from .tables import CurrencyTableCache
 # ===============================
 # CONFIG and CACHE
 # ===============================
@@ -9,21 +20,71 @@ PRIMARY_URL = "https://cdn.jsdelivr.net/npm/@fawazahmed0/currency-api@{date}/{ap
 FALLBACK_URL = (
     "https://{date}.currency-api.pages.dev/{api_version}/currencies/{base}.json"
 )
+# Concurrency for cold-cache history fetches
+FETCH_WORKERS = 8
+MAX_CONNECTIONS_PER_HOST = 4
+
+_host_slots = {}
+_host_slots_lock = threading.Lock()
+
+# Shared keep-alive session and one circuit breaker per data source
+_session = make_session(pool_size=FETCH_WORKERS * 2)
+_breakers = {
+    "primary": CircuitBreaker("primary"),
+    "fallback": CircuitBreaker("fallback"),
+}
+
 # ---Cache part---
 CACHE_FILE = "fx_cache.json"
+CACHE_DB = "fx_cache.sqlite"
+# "json" (default) or "sqlite"; the SQLite store imports fx_cache.json on first use
+CACHE_BACKEND = os.getenv("FX_CACHE_BACKEND", "json")
+# Full per-date currency tables (every target for a base)
+TABLES_DIR = "fx_tables"
+# Seconds a "latest" table is fresh; after that it is served stale while refreshing
+LATEST_TTL = float(os.getenv("FX_LATEST_TTL", "300"))
+
+_store = None
+_tables = None
+_latest = None
+
+
+def get_store():
+    # One store per process; the file is only read on first use
+    global _store
+    if _store is None:
+        if CACHE_BACKEND == "sqlite":
+            from .sqlite_store import SQLiteRateStore
+
+            _store = SQLiteRateStore(CACHE_DB, migrate_from=CACHE_FILE)
+        else:
+            _store = RateStore(CACHE_FILE)
+    return _store
+
+
+def get_tables():
+    global _tables
+    if _tables is None:
+        _tables = CurrencyTableCache(TABLES_DIR)
+    return _tables
+
+
+def get_latest_cache():
+    global _latest
+    if _latest is None:
+        _latest = LatestRateCache(
+            lambda base, api_version: fetch_table(base=base, date="latest", api_version=api_version),
+            ttl=LATEST_TTL,
+        )
+    return _latest
 
 
 def load_cache():
-    try:
-        with open(CACHE_FILE, "r") as f:
-            return json.load(f)
-    except Exception:
-        return {}
+    return get_store().snapshot()
 
 
 def save_cache(cache):
-    with open(CACHE_FILE, "w") as f:
-        json.dump(cache, f)
+    get_store().replace(cache)
 
 
 # ---End Cache part---
@@ -34,51 +95,193 @@ def save_cache(cache):
 # ===============================
 
 
-def get_current_rate(base="inr", target="aud", date="latest", api_version="v1"):
-    # Cache check first
-    cache = load_cache()
-    cache_key = f"{date}_{base}_{target}"
-    if cache_key in cache:
-        return cache[cache_key]
+def _host_slot(url):
+    # Bounded concurrency per host. The fallback puts the date in the
+    # subdomain, so a leading date/"latest" label is folded into one host.
+    host = urlparse(url).hostname or ""
+    label, _, rest = host.partition(".")
+    if rest and (label == "latest" or label[:4].isdigit()):
+        host = rest
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+        return _host_slots[host]
+
+
+def _get_json(url, source):
+    with _host_slot(url):
+        return get_json(_session, url, _breakers[source], timeout=5)
 
+
+def source_stats():
+    # Per-source request/error/latency counters and circuit state
+    return {source: breaker.stats() for source, breaker in _breakers.items()}
+
+
+def fetch_table(base="inr", date="latest", api_version="v1"):
+    # Network only: primary source, then the fallback mirror.
+    # Returns every quoted currency for `base` on `date`.
     primary_url = PRIMARY_URL.format(date=date, api_version=api_version, base=base)
     fallback_url = FALLBACK_URL.format(date=date, api_version=api_version, base=base)
 
     try:
-        response = requests.get(primary_url, timeout=5)
-        response.raise_for_status()
-        rate = response.json()[base][target]
-
+        table = _get_json(primary_url, "primary")[base]
     except Exception:
-        response = requests.get(fallback_url, timeout=5)
-        response.raise_for_status()
-        rate = response.json()[base][target]
+        table = _get_json(fallback_url, "fallback")[base]
 
-    # save to cache if its not latest
+    # Dated tables never change, so keep the whole document
     if date != "latest":
-        cache[cache_key] = rate
-        save_cache(cache)
+        get_tables().put(date, base, table)
+    return table
+
 
+def fetch_rate(base="inr", target="aud", date="latest", api_version="v1"):
+    # Any pair already covered by a cached table (directly or via a
+    # common base) is answered without a request
+    if date != "latest":
+        rate = get_tables().rate(date, base, target)
+        if rate is not None:
+            return rate
+    return fetch_table(base=base, date=date, api_version=api_version)[target]
+
+
+def fetch_rates_concurrently(base, target, dates, api_version="v1", max_workers=FETCH_WORKERS):
+    """
+    Fetches many dates through a bounded thread pool. Returns
+    ({date: rate}, {date: error}) so the caller decides what to skip.
+    """
+    rates, errors = {}, {}
+    if not dates:
+        return rates, errors
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(dates))) as pool:
+        futures = {
+            pool.submit(fetch_rate, base=base, target=target, date=date, api_version=api_version): date
+            for date in dates
+        }
+        for future in as_completed(futures):
+            date = futures[future]
+            try:
+                rates[date] = future.result()
+            except Exception as e:
+                errors[date] = e
+    return rates, errors
+
+
+def get_current_rate(base="inr", target="aud", date="latest", api_version="v1"):
+    if date == "latest":
+        # Short TTL cache; never written to the persistent store
+        return get_latest_cache().get(base, api_version)[target]
+
+    # Cache check first
+    store = get_store()
+    cache_key = f"{date}_{base}_{target}"
+    rate = store.get(cache_key)
+    if rate is not None:
+        return rate
+
+    rate = fetch_rate(base=base, target=target, date=date, api_version=api_version)
+    store.put(cache_key, rate)
     return rate
 
 
 def get_historical_rates(base="inr", target="aud", days=40):
-    rates = []
-    # Using a cache means this loop will eventually run instantly
-    cache = load_cache()
+    now = datetime.datetime.now()
+
+    # Fast path: a gap-free window of an exported memory-mapped series
+    series = open_series(base, target)
+    first, last = (now - datetime.timedelta(days=days)).date(), (now - datetime.timedelta(days=1)).date()
+    if series is not None and series.covers(first, last):
+        window = series.window(first, last)
+        if not np.isnan(window).any():
+            return window.tolist()
+
+    store = get_store()
+    dates = [(now - datetime.timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days, 0, -1)]
 
     # identify which dates we need to fetch
     print(f"Checking cache for {days} days of history...")
+    cached = {date: store.get(make_key(date, base, target)) for date in dates}
+    missing = [date for date, rate in cached.items() if rate is None]
 
-    for i in range(days, 0, -1):
-        date = (datetime.datetime.now() - datetime.timedelta(days=i)).strftime(
-            "%Y-%m-%d"
-        )
-        try:
-            # We use the same get_current_rate function but pass a specific date
-            rate = get_current_rate(base=base, target=target, date=date)
-            rates.append(rate)
-        except Exception as e:
+    if missing:
+        fetched, errors = fetch_rates_concurrently(base, target, missing)
+        for date, e in sorted(errors.items()):
             print(f"Skipping {date} due to fetch error.{e}")
-            continue
-    return rates
\ No newline at end of file
+        # Write the newly fetched days back in one batch
+        store.put_many({make_key(date, base, target): rate for date, rate in fetched.items()})
+        cached.update(fetched)
+
+    return [cached[date] for date in dates if cached[date] is not None]
+
+
+# ===============================
+# Batched multi-pair data
+# ===============================
+
+
+def get_current_rates(pairs, api_version="v1"):
+    # One "latest" table per distinct base covers every pair sharing it
+    latest = get_latest_cache()
+    return np.array([latest.get(base, api_version)[target] for base, target in pairs])
+
+
+def get_historical_matrix(pairs, days=40, max_workers=FETCH_WORKERS):
+    """
+    (dates, matrix) with one row per (base, target) pair and one column per
+    day, oldest first. Missing cells are answered from cached tables,
+    directly or as cross rates; only then are tables fetched, per date the
+    base shared by the most unanswered pairs, concurrently and in rounds so
+    one fetched table can answer other pairs before more are requested.
+    Gaps are forward-filled and leading gaps stay NaN.
+    """
+    store = get_store()
+    tables = get_tables()
+    now = datetime.datetime.now()
+    dates = [(now - datetime.timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days, 0, -1)]
+
+    matrix = np.array(
+        [[store.get(make_key(d, base, target), np.nan) for d in dates] for base, target in pairs],
+        dtype=float,
+    )
+    stored = ~np.isnan(matrix)
+
+    def fill_from_tables():
+        for col in np.flatnonzero(np.isnan(matrix).any(axis=0)):
+            rows = np.flatnonzero(np.isnan(matrix[:, col]))
+            matrix[rows, col] = tables.rates_for(dates[col], [pairs[r] for r in rows])
+
+    fill_from_tables()
+    attempted = set()
+    while True:
+        wanted = []
+        for col in np.flatnonzero(np.isnan(matrix).any(axis=0)):
+            bases = Counter(
+                pairs[r][0] for r in np.flatnonzero(np.isnan(matrix[:, col]))
+                if (pairs[r][0], dates[col]) not in attempted
+            )
+            if bases:
+                wanted.append((bases.most_common(1)[0][0], dates[col]))
+        if not wanted:
+            break
+        attempted.update(wanted)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(wanted))) as pool:
+            futures = {pool.submit(fetch_table, base=base, date=date): (base, date) for base, date in wanted}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    base, date = futures[future]
+                    print(f"Skipping {date} ({base}) due to fetch error.{e}")
+        fill_from_tables()
+
+    # Write back every pair rate we now know in one batch
+    store.put_many({
+        make_key(dates[col], *pairs[row]): float(matrix[row, col])
+        for row, col in np.argwhere(~stored & ~np.isnan(matrix))
+    })
+
+    # Forward-fill gaps along the date axis
+    idx = np.where(np.isnan(matrix), 0, np.arange(matrix.shape[1]))
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    filled = matrix[np.arange(matrix.shape[0])[:, None], idx]
+    return dates, filled
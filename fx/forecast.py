@@ -0,0 +1,116 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# ===============================
+# FORECAST SUMMARY
+# ===============================
+# Compact stand-in for the raw terminal-rate list. Everything downstream
+# (scenario, risk band, prob_up, logging) reads these numbers instead of
+# rescanning the paths; the paths themselves are kept only on request.
+
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+DEFAULT_BANDS = (0.02,)
+
+
+@dataclass
+class ForecastSummary:
+    current_rate: float
+    mean: float
+    std: float
+    prob_up: float
+    band_probs: dict
+    quantiles: dict = field(default_factory=dict)
+    standard_errors: dict = field(default_factory=dict)
+    histogram: tuple = None  # (counts, bin_edges)
+    simulations: int = 0
+    method: str = "plain"
+    paths: np.ndarray = None
+
+    @classmethod
+    def from_paths(
+        cls,
+        terminal,
+        current_rate,
+        bands=DEFAULT_BANDS,
+        quantiles=DEFAULT_QUANTILES,
+        bins=None,
+        keep_paths=False,
+        method="plain",
+    ):
+        terminal = np.asarray(terminal, dtype=float)
+        qs = np.quantile(terminal, quantiles) if len(quantiles) else []
+        return cls(
+            current_rate=current_rate,
+            mean=float(terminal.mean()),
+            std=float(terminal.std()),
+            prob_up=float((terminal > current_rate).mean()),
+            band_probs={
+                b: float(
+                    ((terminal >= current_rate * (1 - b)) & (terminal <= current_rate * (1 + b))).mean()
+                )
+                for b in bands
+            },
+            quantiles={q: float(v) for q, v in zip(quantiles, qs)},
+            histogram=np.histogram(terminal, bins=bins) if bins else None,
+            simulations=len(terminal),
+            method=method,
+            paths=terminal if keep_paths else None,
+        )
+
+    @classmethod
+    def from_estimates(
+        cls, estimates, current_rate, band=0.02, quantiles=DEFAULT_QUANTILES, bins=None, keep_paths=False
+    ):
+        """
+        Builds a summary from any engine's estimate dict (analytic,
+        fixed, adaptive or parallel). Method-aware estimates and standard
+        errors win; the paths, if any, only fill in quantiles/histogram.
+        """
+        terminal = estimates.get("terminal")
+        if terminal is not None:
+            summary = cls.from_paths(
+                terminal,
+                current_rate,
+                bands=(band,),
+                quantiles=quantiles,
+                bins=bins,
+                keep_paths=keep_paths,
+                method=estimates["method"],
+            )
+        else:
+            summary = cls(
+                current_rate=current_rate,
+                mean=estimates["expected"],
+                std=estimates.get("std"),
+                prob_up=estimates["prob_up"],
+                band_probs={},
+                quantiles=dict(estimates.get("quantiles", {})),
+                method=estimates["method"],
+            )
+        summary.mean = estimates["expected"]
+        summary.prob_up = estimates["prob_up"]
+        summary.band_probs[band] = estimates["band_prob"]
+        summary.simulations = estimates["simulations"]
+        summary.standard_errors = {
+            "mean": estimates["expected_se"],
+            "prob_up": estimates["prob_up_se"],
+            "band": estimates["band_prob_se"],
+        }
+        return summary
+
+    def band_probability(self, band=0.02):
+        return self.band_probs[band]
+
+    def to_dict(self):
+        # JSON-friendly view without the paths
+        return {
+            "mean": self.mean,
+            "std": self.std,
+            "prob_up": self.prob_up,
+            "band_probs": {str(b): p for b, p in self.band_probs.items()},
+            "quantiles": {str(q): v for q, v in self.quantiles.items()},
+            "standard_errors": self.standard_errors,
+            "simulations": self.simulations,
+            "method": self.method,
+        }
@@ -0,0 +1,61 @@
+import numpy as np
+
+from .sim import simulate_paths
+
+# ===============================
+# MULTI-HORIZON FORECAST + SEND-DAY SEARCH
+# ===============================
+# One simulation with cumulative path states answers every horizon from
+# 1 to N days at once, instead of N separate runs.
+
+
+def forecast_curve(
+    current_rate,
+    drift,
+    volatility,
+    horizon=30,
+    simulations=10_000,
+    seed=None,
+    method="plain",
+    quantiles=(0.05, 0.5, 0.95),
+):
+    """
+    Per-horizon statistics, each an array indexed by day - 1:
+    prob_up, expected, std and one quantile array per requested level.
+    """
+    paths = simulate_paths(
+        current_rate, drift, volatility, days=horizon, simulations=simulations, seed=seed, method=method
+    )
+    qs = np.quantile(paths, quantiles, axis=0)
+    return {
+        "days": np.arange(1, horizon + 1),
+        "current_rate": current_rate,
+        "prob_up": (paths > current_rate).mean(axis=0),
+        "expected": paths.mean(axis=0),
+        "std": paths.std(axis=0),
+        "quantiles": {q: qs[i] for i, q in enumerate(quantiles)},
+        "simulations": len(paths),
+    }
+
+
+def best_send_day(curve, risk_aversion=1.0):
+    """
+    Best day to convert, counting today as day 0 (rate known, no risk).
+    A higher rate is better for the sender. "best_expected_day" maximises
+    the expected rate; "best_risk_adjusted_day" maximises
+    expected - risk_aversion * std.
+    """
+    expected = np.concatenate(([curve["current_rate"]], curve["expected"]))
+    std = np.concatenate(([0.0], curve["std"]))
+    score = expected - risk_aversion * std
+
+    best_expected = int(np.argmax(expected))
+    best_adjusted = int(np.argmax(score))
+    return {
+        "best_expected_day": best_expected,
+        "best_expected_rate": float(expected[best_expected]),
+        "best_risk_adjusted_day": best_adjusted,
+        "best_risk_adjusted_rate": float(expected[best_adjusted]),
+        "risk_adjusted_score": float(score[best_adjusted]),
+        "risk_aversion": risk_aversion,
+    }
@@ -0,0 +1,114 @@
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ===============================
+# POOLED HTTP + PER-SOURCE HEALTH
+# ===============================
+# One keep-alive session shared by every FX request, short retries with
+# jittered backoff, and a circuit breaker per data source so a failing
+# CDN is skipped instead of being tried (and timed out on) every call.
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; after
+    `reset_timeout` seconds one half-open probe is let through, and its
+    result closes or re-opens the circuit.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.skipped = 0
+        self.total_latency = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.skipped += 1
+            return False
+
+    def record(self, ok, latency):
+        with self._lock:
+            self.requests += 1
+            self.total_latency += latency
+            self._probe_in_flight = False
+            if ok:
+                self.state = "closed"
+                self.consecutive_failures = 0
+                return
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "requests": self.requests,
+                "failures": self.failures,
+                "skipped": self.skipped,
+                "avg_latency": self.total_latency / self.requests if self.requests else None,
+            }
+
+
+def make_session(pool_size=16):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _retryable(error):
+    # Connection problems, timeouts and 5xx are worth retrying; 4xx are not
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+def get_json(session, url, breaker, timeout=5, retries=1, backoff=0.25):
+    if not breaker.allow():
+        raise CircuitOpenError(f"{breaker.name} circuit is open; skipping {url}")
+
+    for attempt in range(retries + 1):
+        start = time.time()
+        try:
+            response = session.get(url, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            # A 4xx (e.g. a date the API does not have) says the source is healthy
+            client_error = isinstance(e, requests.HTTPError) and not _retryable(e)
+            breaker.record(client_error, time.time() - start)
+            if attempt == retries or not _retryable(e) or not breaker.allow():
+                raise
+            # Exponential backoff with full jitter
+            time.sleep(random.uniform(0, backoff * 2**attempt))
+            continue
+        breaker.record(True, time.time() - start)
+        return data
@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import deque
+
+# ===============================
+# LATEST-RATE CACHE (TTL + STALE-WHILE-REVALIDATE)
+# ===============================
+# "latest" changes during the day, so it is cached for `ttl` seconds only.
+# Past the TTL (but within `max_stale`) the old table is served at once and
+# a background thread refreshes it; only a cold or very old entry blocks.
+
+
+class LatestRateCache:
+    def __init__(self, fetch, ttl=300, max_stale=6 * 3600):
+        self.fetch = fetch  # fetch(base, api_version) -> {currency: rate}
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._entries = {}  # (base, api_version) -> (table, fetched_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        # Seconds spent in blocking fetches, newest last
+        self.blocking_latencies = deque(maxlen=200)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _fetch_and_store(self, key):
+        table = self.fetch(*key)
+        with self._lock:
+            self._entries[key] = (table, time.monotonic())
+        return table
+
+    def _refresh_in_background(self, key):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._fetch_and_store(key)
+            except Exception as e:
+                print(f"Background refresh of latest {key[0]} rates failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def get(self, base, api_version="v1"):
+        key = (base, api_version)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None:
+            table, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                return table
+            if age < self.max_stale:
+                self.stale_hits += 1
+                self._refresh_in_background(key)
+                return table
+
+        self.misses += 1
+        start = time.time()
+        table = self._fetch_and_store(key)
+        self.blocking_latencies.append(time.time() - start)
+        return table
+
+    def stats(self):
+        latencies = list(self.blocking_latencies)
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "last_blocking_latency": latencies[-1] if latencies else None,
+            "avg_blocking_latency": sum(latencies) / len(latencies) if latencies else None,
+        }
@@ -0,0 +1,69 @@
+import math
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+# ===============================
+# MEMOIZED ANALYSIS
+# ===============================
+# History only moves once a day, so features (drift, volatility, MAs) are
+# keyed on (pair, as-of date) and full analyze_fx results additionally on
+# a bucket of the latest rate and the model parameters. Both live in small
+# LRU caches that can optionally be pickled to disk between sessions.
+
+# Width of a latest-rate bucket in log space (1e-4 ~ one basis point)
+RATE_BUCKET = 1e-4
+
+
+def rate_bucket(rate, width=RATE_BUCKET):
+    return round(math.log(rate) / width)
+
+
+class LRUCache:
+    def __init__(self, maxsize=128, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        if path:
+            try:
+                with open(path, "rb") as f:
+                    self._data = pickle.load(f)
+            except Exception:
+                self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            if self.path:
+                self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp.{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self._data, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            if self.path:
+                self._save()
+
+    def stats(self):
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
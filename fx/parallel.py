@@ -0,0 +1,104 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .sim import MOMENT_FIELDS, QUANTILE_BINS, estimates_from_moments, simulate_terminal_rates, summary_moments
+
+# ===============================
+# PARALLEL SIMULATION
+# ===============================
+# Work is cut into fixed-size shards and every shard gets its own child of
+# one SeedSequence, so results depend on the seed and shard layout only,
+# never on how many workers happened to run them.
+
+SHARD_SIZE = 250_000
+
+
+def _run_shard(job):
+    current_rate, drift, volatility, days, simulations, seed_seq, method, band = job
+    rng = np.random.default_rng(seed_seq)
+    terminal = simulate_terminal_rates(
+        current_rate, drift, volatility, days=days, simulations=simulations, seed=rng, method=method
+    )
+    return summary_moments(terminal, current_rate, method, band)
+
+
+def _map(fn, jobs, workers):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        return [fn(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        # map() keeps submission order, so merging is deterministic
+        return list(pool.map(fn, jobs))
+
+
+def parallel_forecast(
+    current_rate,
+    drift,
+    volatility,
+    days=7,
+    simulations=1_000_000,
+    workers=None,
+    seed=None,
+    method="plain",
+    band=0.02,
+    shard_size=SHARD_SIZE,
+):
+    """
+    Shards `simulations` paths across a process pool and merges the
+    per-shard moments into prob_up / band / expected-rate estimates.
+    """
+    if method not in ("plain", "antithetic"):
+        raise ValueError("Parallel simulation supports method='plain' or 'antithetic'.")
+    n_shards = -(-simulations // shard_size)
+    children = np.random.SeedSequence(seed).spawn(n_shards)
+    jobs = [
+        (
+            current_rate,
+            drift,
+            volatility,
+            days,
+            min(shard_size, simulations - i * shard_size),
+            children[i],
+            method,
+            band,
+        )
+        for i in range(n_shards)
+    ]
+
+    n_obs, sums, sumsq = 0, np.zeros(MOMENT_FIELDS), np.zeros(MOMENT_FIELDS)
+    counts = np.zeros(QUANTILE_BINS, dtype=np.int64)
+    for shard_obs, shard_sums, shard_sumsq, shard_counts in _map(_run_shard, jobs, workers):
+        n_obs += shard_obs
+        sums += shard_sums
+        sumsq += shard_sumsq
+        counts += shard_counts
+
+    estimate = estimates_from_moments(n_obs, sums, sumsq, counts, current_rate)
+    estimate["method"] = method
+    estimate["simulations"] = simulations
+    estimate["terminal"] = None
+    return estimate
+
+
+def parallel_forecast_many(
+    params, days=7, simulations=1000, workers=None, seed=None, method="plain", band=0.02
+):
+    """
+    Runs one forecast per (current_rate, drift, volatility) tuple, e.g. one
+    per currency pair or backtest date. Returns estimates in input order.
+    """
+    children = np.random.SeedSequence(seed).spawn(len(params))
+    jobs = [
+        (current_rate, drift, volatility, days, simulations, child, method, band)
+        for (current_rate, drift, volatility), child in zip(params, children)
+    ]
+    results = []
+    for (current_rate, *_), (n_obs, sums, sumsq, counts) in zip(params, _map(_run_shard, jobs, workers)):
+        estimate = estimates_from_moments(n_obs, sums, sumsq, counts, current_rate)
+        estimate["method"] = method
+        estimate["simulations"] = simulations
+        results.append(estimate)
+    return results
@@ -1,12 +1,17 @@
+import numpy as np
+
+from .forecast import ForecastSummary
 
 
 def risk_band_analysis(forecast, current_rate):
+    if isinstance(forecast, ForecastSummary) and 0.02 in forecast.band_probs:
+        return forecast.band_probs[0.02]
+
     lower_band = current_rate * 0.98  # 2% below current
     upper_band = current_rate * 1.02  # 2% above current
 
-    within_band = sum(1 for x in forecast if lower_band <= x <= upper_band) / len(
-        forecast
-    )
+    forecast = np.asarray(forecast)
+    within_band = float(((forecast >= lower_band) & (forecast <= upper_band)).mean())
     return within_band
 
 def confidence_score(result):
@@ -0,0 +1,142 @@
+import numpy as np
+
+# ===============================
+# ROLLING STATISTICS
+# ===============================
+# O(n) window statistics from prefix sums: every window mean/std is two
+# lookups into a cumulative sum, with no per-window slice. Output arrays
+# are aligned with the input, NaN until the first full window. Inputs may
+# be 1-D series or 2-D (pairs x dates) matrices; windows run along the
+# last axis.
+
+
+def _prefix(values):
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    return np.pad(np.cumsum(values, axis=-1), pad)
+
+
+def rolling_mean(rates, window):
+    rates = np.asarray(rates, dtype=float)
+    out = np.full(rates.shape, np.nan)
+    if rates.shape[-1] >= window:
+        c = _prefix(rates)
+        out[..., window - 1 :] = (c[..., window:] - c[..., :-window]) / window
+    return out
+
+
+def rolling_std(rates, window):
+    # Population std (divide by window), as used for the 30-day volatility
+    rates = np.asarray(rates, dtype=float)
+    out = np.full(rates.shape, np.nan)
+    if rates.shape[-1] >= window:
+        # Centring first keeps sum-of-squares from cancelling catastrophically
+        centred = rates - rates.mean(axis=-1, keepdims=True)
+        c1, c2 = _prefix(centred), _prefix(centred**2)
+        s1 = c1[..., window:] - c1[..., :-window]
+        s2 = c2[..., window:] - c2[..., :-window]
+        out[..., window - 1 :] = np.sqrt(np.maximum(s2 / window - (s1 / window) ** 2, 0.0))
+    return out
+
+
+def lag_difference(rates, lag):
+    # rates[t] - rates[t - lag], e.g. the 7-day trend slope
+    rates = np.asarray(rates, dtype=float)
+    out = np.full(rates.shape, np.nan)
+    if rates.shape[-1] > lag:
+        out[..., lag:] = rates[..., lag:] - rates[..., :-lag]
+    return out
+
+
+def rolling_indicators(rates, ma_windows=(7, 30), std_window=30, slope_lag=7):
+    """
+    All trend indicators for a series in one pass over its prefix sums:
+    ma_<w> for each window, std_<std_window>, slope and momentum
+    (rate minus the shortest moving average).
+    """
+    rates = np.asarray(rates, dtype=float)
+    indicators = {f"ma_{w}": rolling_mean(rates, w) for w in ma_windows}
+    indicators[f"std_{std_window}"] = rolling_std(rates, std_window)
+    indicators["slope"] = lag_difference(rates, slope_lag)
+    indicators["momentum"] = rates - indicators[f"ma_{min(ma_windows)}"]
+    return indicators
+
+
+def log_return_stats(rates):
+    # (mean, population std) of daily log-returns; arrays for a matrix
+    log_returns = np.diff(np.log(np.asarray(rates, dtype=float)), axis=-1)
+    drift, volatility = log_returns.mean(axis=-1), log_returns.std(axis=-1)
+    if log_returns.ndim == 1:
+        return float(drift), float(volatility)
+    return drift, volatility
+
+
+# ===============================
+# EXPONENTIAL + OSCILLATOR INDICATORS
+# ===============================
+
+
+def ewma(values, span=None, alpha=None):
+    """
+    Exponentially weighted mean (recursive form, seeded with the first
+    value), computed block-wise in closed form instead of element by
+    element: y_j = d^(j+1) * y_prev + alpha * sum_i d^(j-i) * x_i.
+    """
+    if alpha is None:
+        alpha = 2.0 / (span + 1)
+    x = np.asarray(values, dtype=float)
+    out = np.empty_like(x)
+    if not len(x):
+        return out
+    decay = 1.0 - alpha
+    if decay <= 0:
+        out[:] = x
+        return out
+
+    # Keep d^-n well inside float range within a block
+    block = int(min(1024, max(1, 150 / -np.log10(decay))))
+    prev = x[0]
+    for start in range(0, len(x), block):
+        chunk = x[start : start + block]
+        j = np.arange(len(chunk))
+        weighted = np.cumsum(chunk * decay ** (-j))
+        out[start : start + len(chunk)] = decay ** (j + 1) * prev + alpha * decay**j * weighted
+        prev = out[start + len(chunk) - 1]
+    return out
+
+
+def macd(rates, fast=12, slow=26, signal=9):
+    line = ewma(rates, span=fast) - ewma(rates, span=slow)
+    signal_line = ewma(line, span=signal)
+    return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+
+
+def rsi_series(rates, period=14):
+    # Wilder's RSI: gains/losses smoothed with alpha = 1 / period
+    rates = np.asarray(rates, dtype=float)
+    out = np.full(len(rates), np.nan)
+    if len(rates) <= period:
+        return out
+    change = np.diff(rates)
+    avg_gain = ewma(np.maximum(change, 0.0), alpha=1.0 / period)
+    avg_loss = ewma(np.maximum(-change, 0.0), alpha=1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    rsi[(avg_gain == 0) & (avg_loss == 0)] = 50.0
+    # change[k] is day k+1; wait for a full period before reporting
+    out[period:] = rsi[period - 1 :]
+    return out
+
+
+def bollinger_position_series(rates, window=20, num_std=2.0):
+    """
+    Where each rate sits inside its Bollinger band: 0 at the lower band,
+    1 at the upper band, clipped to [0, 1]; 0.5 when the band is flat.
+    """
+    rates = np.asarray(rates, dtype=float)
+    mid = rolling_mean(rates, window)
+    width = 2 * num_std * rolling_std(rates, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        position = (rates - (mid - width / 2)) / width
+    position = np.where(width > 0, np.clip(position, 0.0, 1.0), 0.5)
+    position[np.isnan(mid)] = np.nan
+    return position
@@ -0,0 +1,128 @@
+"""
+fx/series.py - Memory-mapped daily rate series
+
+Usage:
+    python -m fx.series --pair inr:aud        # export the pair from the rate store
+
+One file per pair, fx_series/<base>_<target>.f64s:
+    32-byte header: magic b"FXTS", uint32 version, int64 first-day ordinal,
+                    int64 day count, 8 reserved bytes
+    then one little-endian float64 per calendar day (NaN = no rate)
+
+Files are opened with numpy.memmap, so any window is a zero-copy slice and
+opening costs the same whatever the history length; the OS page cache
+shares the pages between processes.
+"""
+
+import argparse
+import os
+import struct
+from datetime import date
+
+import numpy as np
+
+SERIES_DIR = "fx_series"
+MAGIC = b"FXTS"
+VERSION = 1
+HEADER = struct.Struct("<4sIqq8x")
+
+
+def series_path(base, target, directory=SERIES_DIR):
+    return os.path.join(directory, f"{base}_{target}.f64s")
+
+
+def write_series(path, rows):
+    """
+    Writes [(YYYY-MM-DD, rate)] rows as a dense daily series, replacing
+    any existing file atomically.
+    """
+    if not rows:
+        raise ValueError("No rates to write.")
+    ordinals = [date.fromisoformat(d).toordinal() for d, _ in rows]
+    first = min(ordinals)
+    values = np.full(max(ordinals) - first + 1, np.nan, dtype="<f8")
+    for ordinal, (_, rate) in zip(ordinals, rows):
+        values[ordinal - first] = rate
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, first, len(values)))
+        values.tofile(f)
+    os.replace(tmp_path, path)
+    return len(values)
+
+
+class RateSeries:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, first, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a v{VERSION} FX series file.")
+        self.path = path
+        self.first_day = date.fromordinal(first)
+        self.values = np.memmap(path, dtype="<f8", mode="r", offset=HEADER.size, shape=(count,))
+
+    @property
+    def last_day(self):
+        return date.fromordinal(self.first_day.toordinal() + len(self.values) - 1)
+
+    def _index(self, day):
+        return day.toordinal() - self.first_day.toordinal()
+
+    def covers(self, start, end):
+        return self.first_day <= start and end <= self.last_day
+
+    def window(self, start, end):
+        # Zero-copy view of [start, end] (dates, inclusive); NaN = missing day
+        if not self.covers(start, end):
+            raise KeyError(f"{self.path} covers {self.first_day}..{self.last_day}, not {start}..{end}")
+        return self.values[self._index(start) : self._index(end) + 1]
+
+    def dates(self, start=None, end=None):
+        start = start or self.first_day
+        end = end or self.last_day
+        return [date.fromordinal(o) for o in range(start.toordinal(), end.toordinal() + 1)]
+
+
+_open_series = {}
+
+
+def open_series(base, target, directory=SERIES_DIR):
+    """
+    Cached RateSeries for a pair, or None when no file exists. Reopens if
+    the file was re-exported since.
+    """
+    path = series_path(base, target, directory)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _open_series.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, RateSeries(path))
+        _open_series[path] = cached
+    return cached[1]
+
+
+def export_series(base, target, directory=SERIES_DIR):
+    from .data import get_store
+
+    rows = get_store().get_range(base, target)
+    days = write_series(series_path(base, target, directory), rows)
+    print(f"Wrote {len(rows)} rates over {days} days to {series_path(base, target, directory)}")
+    return days
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a pair to a memory-mapped series file")
+    parser.add_argument("--pair", default="inr:aud", help="base:target, e.g. inr:aud")
+    parser.add_argument("--dir", default=SERIES_DIR)
+    args = parser.parse_args()
+
+    base, target = args.pair.lower().split(":")
+    export_series(base, target, args.dir)
+
+
+if __name__ == "__main__":
+    main()
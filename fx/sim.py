@@ -1,12 +1,333 @@
-import math
-import random
-
-def monte_carlo_simulation(current_rate, drift, volatility, days=30, simulations=1000):
-    results = []
-    for _ in range(simulations):
-        price = current_rate
-        for _ in range(days):
-            shock = random.gauss(drift, volatility)
-            price *= math.exp(shock)
-        results.append(price)
-    return results
\ No newline at end of file
+import numpy as np
+
+from .analytic import gbm_expected_rate
+
+SIM_METHODS = ("plain", "antithetic", "control", "sobol", "halton")
+QMC_METHODS = ("sobol", "halton")
+# Independent scrambles used to get an error estimate out of quasi-random runs
+QMC_REPLICATES = 8
+# Columns tracked by summary_moments: up, within band, rate, rate^2
+MOMENT_FIELDS = 4
+# Mergeable quantile sketch: fixed bins over log(S_T / S_0), so shard and
+# chunk histograms add up exactly. 4096 bins over +/-0.5 resolve about
+# 0.025% of the rate; anything outside lands in the edge bins.
+QUANTILE_BINS = 4096
+QUANTILE_RANGE = 0.5
+DEFAULT_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def make_rng(seed=None):
+    # Accepts an int, a SeedSequence or an existing Generator
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def _qmc_normals(simulations, days, method, rng):
+    try:
+        from scipy.special import ndtri
+        from scipy.stats import qmc
+    except ImportError as e:
+        raise ImportError(f"method='{method}' requires scipy") from e
+
+    per_replicate = -(-simulations // QMC_REPLICATES)
+    if method == "sobol":
+        # Sobol points are only balanced in blocks of 2^m, so round up
+        # (the default 1000 simulations become 8 x 128 = 1024 rows)
+        per_replicate = 1 << (per_replicate - 1).bit_length()
+    engine_cls = qmc.Sobol if method == "sobol" else qmc.Halton
+    blocks = []
+    for _ in range(QMC_REPLICATES):
+        engine = engine_cls(d=days, scramble=True, seed=rng)
+        if method == "sobol":
+            u = engine.random_base2(per_replicate.bit_length() - 1)
+        else:
+            u = engine.random(per_replicate)
+        blocks.append(u)
+    # Keep the open interval so ndtri never returns +/-inf
+    u = np.clip(np.vstack(blocks), 1e-12, 1 - 1e-12)
+    return ndtri(u)
+
+
+def standard_normal_shocks(simulations, days, method="plain", seed=None):
+    """
+    Returns a matrix of N(0, 1) shocks laid out for the given method:
+    antithetic runs are [Z; -Z] and quasi-random runs are QMC_REPLICATES
+    stacked blocks, so the row count can be rounded up.
+    """
+    if method not in SIM_METHODS:
+        raise ValueError(f"Unknown simulation method '{method}'. Use one of {SIM_METHODS}.")
+    rng = make_rng(seed)
+    if method == "antithetic":
+        half = rng.standard_normal(size=(-(-simulations // 2), days))
+        return np.concatenate([half, -half])
+    if method in QMC_METHODS:
+        return _qmc_normals(simulations, days, method, rng)
+    return rng.standard_normal(size=(simulations, days))
+
+
+def simulate_terminal_rates(
+    current_rate, drift, volatility, days=30, simulations=1000, seed=None, method="plain"
+):
+    """
+    Batched GBM engine: draws the whole (simulations x days) shock matrix at
+    once and returns the terminal rates as a NumPy array.
+    """
+    shocks = drift + volatility * standard_normal_shocks(simulations, days, method, seed)
+    # Cumulative log-return of each path over the horizon
+    log_paths = shocks.sum(axis=1)
+    return current_rate * np.exp(log_paths)
+
+
+def simulate_paths(
+    current_rate, drift, volatility, days=30, simulations=1000, seed=None, method="plain"
+):
+    """
+    Like simulate_terminal_rates but keeps the cumulative state: returns a
+    (simulations x days) array whose column d-1 is the rate after d days.
+    """
+    shocks = drift + volatility * standard_normal_shocks(simulations, days, method, seed)
+    return current_rate * np.exp(np.cumsum(shocks, axis=1))
+
+
+def monte_carlo_simulation(
+    current_rate, drift, volatility, days=30, simulations=1000, seed=None
+):
+    # Compatible wrapper: callers still get a plain list of floats
+    return simulate_terminal_rates(
+        current_rate, drift, volatility, days=days, simulations=simulations, seed=seed
+    ).tolist()
+
+
+# ===============================
+# ESTIMATES + STANDARD ERRORS
+# ===============================
+
+
+def _mean_and_se(values, method, control=None, control_mean=None):
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+
+    if method == "antithetic":
+        # Each (Z, -Z) pair is one independent observation
+        half = n // 2
+        values = 0.5 * (values[:half] + values[half:])
+    elif method in QMC_METHODS:
+        # Spread between independent scrambles is the error estimate
+        values = values.reshape(QMC_REPLICATES, -1).mean(axis=1)
+    elif method == "control" and control is not None:
+        var_c = control.var()
+        if var_c > 0:
+            beta = np.mean((values - values.mean()) * (control - control.mean())) / var_c
+            values = values - beta * (control - control_mean)
+
+    if len(values) < 2:
+        return float(values.mean()), 0.0
+    return float(values.mean()), float(values.std(ddof=1) / np.sqrt(len(values)))
+
+
+def forecast_estimates(
+    current_rate,
+    drift,
+    volatility,
+    days=7,
+    simulations=1000,
+    seed=None,
+    method="plain",
+    band=0.02,
+):
+    """
+    Simulates with the chosen method and returns prob_up, the +/-band
+    probability and the expected rate, each with its standard error.
+    """
+    terminal = simulate_terminal_rates(
+        current_rate, drift, volatility, days=days, simulations=simulations, seed=seed, method=method
+    )
+
+    # Control variate: the terminal rate itself, whose GBM mean is known exactly
+    control = terminal if method == "control" else None
+    control_mean = gbm_expected_rate(current_rate, drift, volatility, days)
+
+    up = (terminal > current_rate).astype(float)
+    within = (
+        (terminal >= current_rate * (1 - band)) & (terminal <= current_rate * (1 + band))
+    ).astype(float)
+
+    prob_up, prob_up_se = _mean_and_se(up, method, control, control_mean)
+    band_prob, band_prob_se = _mean_and_se(within, method, control, control_mean)
+    # The control variate correction can nudge a probability just outside [0, 1]
+    prob_up = min(max(prob_up, 0.0), 1.0)
+    band_prob = min(max(band_prob, 0.0), 1.0)
+    expected, expected_se = _mean_and_se(terminal, method, control, control_mean)
+
+    return {
+        "method": method,
+        "simulations": len(terminal),
+        "prob_up": prob_up,
+        "prob_up_se": prob_up_se,
+        "band_prob": band_prob,
+        "band_prob_se": band_prob_se,
+        "expected": expected,
+        "expected_se": expected_se,
+        "terminal": terminal,
+    }
+
+
+# ===============================
+# STREAMING + MERGEABLE SUMMARIES
+# ===============================
+
+
+def log_return_histogram(terminal, current_rate):
+    # Counts of log(S_T / S_0) in the fixed QUANTILE_BINS bins
+    width = 2 * QUANTILE_RANGE / QUANTILE_BINS
+    index = np.floor((np.log(terminal / current_rate) + QUANTILE_RANGE) / width)
+    index = np.clip(index, 0, QUANTILE_BINS - 1).astype(np.intp)
+    return np.bincount(index, minlength=QUANTILE_BINS)
+
+
+def histogram_quantiles(counts, current_rate, quantiles=DEFAULT_QUANTILES):
+    # Linear interpolation inside the bin that crosses each quantile
+    edges = np.linspace(-QUANTILE_RANGE, QUANTILE_RANGE, QUANTILE_BINS + 1)
+    cdf = np.concatenate([[0.0], np.cumsum(counts) / counts.sum()])
+    log_q = np.interp(quantiles, cdf, edges)
+    return {q: float(current_rate * np.exp(v)) for q, v in zip(quantiles, log_q)}
+
+
+def summary_moments(terminal, current_rate, method="plain", band=0.02):
+    """
+    Mergeable summary of a batch of terminal rates: observation count,
+    sums and sums of squares of [up, within band, rate, rate^2], and the
+    log-return histogram the quantiles are read from.
+    """
+    counts = log_return_histogram(terminal, current_rate)
+    values = np.column_stack([
+        terminal > current_rate,
+        (terminal >= current_rate * (1 - band)) & (terminal <= current_rate * (1 + band)),
+        terminal,
+        terminal**2,
+    ]).astype(float)
+    if method == "antithetic":
+        # Each (Z, -Z) pair is one independent observation
+        half = len(values) // 2
+        values = 0.5 * (values[:half] + values[half:])
+    return len(values), values.sum(axis=0), (values**2).sum(axis=0), counts
+
+
+def estimates_from_moments(n_obs, sums, sumsq, counts=None, current_rate=None, quantiles=DEFAULT_QUANTILES):
+    means = sums / n_obs
+    variances = np.maximum(sumsq / n_obs - means**2, 0.0) * n_obs / max(n_obs - 1, 1)
+    ses = np.sqrt(variances / n_obs)
+    return {
+        "prob_up": float(means[0]),
+        "prob_up_se": float(ses[0]),
+        "band_prob": float(means[1]),
+        "band_prob_se": float(ses[1]),
+        "expected": float(means[2]),
+        "expected_se": float(ses[2]),
+        # E[S^2] - E[S]^2 is the spread of the rate itself, pairing or not
+        "std": float(np.sqrt(max(means[3] - means[2] ** 2, 0.0))),
+        "quantiles": histogram_quantiles(counts, current_rate, quantiles) if counts is not None else {},
+    }
+
+
+def stream_forecast(
+    current_rate,
+    drift,
+    volatility,
+    days=7,
+    chunk_size=1000,
+    max_simulations=100_000,
+    seed=None,
+    method="plain",
+    band=0.02,
+):
+    """
+    Simulates in chunks and yields running estimates after each one.
+    Only running sums are kept, so memory stays O(chunk_size).
+    """
+    if method not in ("plain", "antithetic"):
+        raise ValueError("Streaming simulation supports method='plain' or 'antithetic'.")
+    rng = make_rng(seed)
+    n_obs = 0
+    sums = np.zeros(MOMENT_FIELDS)
+    sumsq = np.zeros(MOMENT_FIELDS)
+    counts = np.zeros(QUANTILE_BINS, dtype=np.int64)
+    simulated = 0
+
+    while simulated < max_simulations:
+        size = min(chunk_size, max_simulations - simulated)
+        terminal = simulate_terminal_rates(
+            current_rate, drift, volatility, days=days, simulations=size, seed=rng, method=method
+        )
+        chunk_obs, chunk_sums, chunk_sumsq, chunk_counts = summary_moments(terminal, current_rate, method, band)
+        n_obs += chunk_obs
+        sums += chunk_sums
+        sumsq += chunk_sumsq
+        counts += chunk_counts
+        simulated += len(terminal)
+
+        estimate = estimates_from_moments(n_obs, sums, sumsq, counts, current_rate)
+        estimate["method"] = method
+        estimate["simulations"] = simulated
+        estimate["terminal"] = terminal
+        yield estimate
+
+
+def adaptive_forecast(
+    current_rate,
+    drift,
+    volatility,
+    days=7,
+    tolerance=0.01,
+    z=1.96,
+    thresholds=(0.4, 0.6),
+    chunk_size=1000,
+    max_simulations=100_000,
+    seed=None,
+    method="plain",
+    band=0.02,
+    keep_paths=False,
+):
+    """
+    Early-stopping Monte Carlo. Stops once the prob_up CI half-width is
+    below `tolerance`, or once the CI sits clearly on one side of every
+    decision threshold, or when max_simulations is reached.
+    """
+    low, high = thresholds
+    paths = []
+    estimate = None
+    stopped_by = "max_simulations"
+
+    for estimate in stream_forecast(
+        current_rate,
+        drift,
+        volatility,
+        days=days,
+        chunk_size=chunk_size,
+        max_simulations=max_simulations,
+        seed=seed,
+        method=method,
+        band=band,
+    ):
+        if keep_paths:
+            paths.append(estimate["terminal"])
+
+        half_width = z * estimate["prob_up_se"]
+        lo_ci = estimate["prob_up"] - half_width
+        hi_ci = estimate["prob_up"] + half_width
+        if half_width <= tolerance:
+            stopped_by = "tolerance"
+            break
+        # Decision is settled when no threshold falls inside the CI
+        if not any(lo_ci <= t <= hi_ci for t in (low, high)):
+            stopped_by = "decision"
+            break
+
+    estimate["terminal"] = np.concatenate(paths) if keep_paths else None
+    estimate["stopped_by"] = stopped_by
+    estimate["prob_up_ci"] = (
+        max(estimate["prob_up"] - z * estimate["prob_up_se"], 0.0),
+        min(estimate["prob_up"] + z * estimate["prob_up_se"], 1.0),
+    )
+    return estimate
@@ -0,0 +1,123 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+
+from .store import make_key, parse_key
+
+# ===============================
+# SQLITE RATE STORE
+# ===============================
+# Same interface as fx.store.RateStore, backed by an indexed table so a
+# date range for one pair is a single primary-key scan instead of a
+# whole-file load.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rates (
+    base   TEXT NOT NULL,
+    target TEXT NOT NULL,
+    date   TEXT NOT NULL,
+    rate   REAL NOT NULL,
+    PRIMARY KEY (base, target, date)
+) WITHOUT ROWID
+"""
+
+
+def _row(key, rate):
+    date, base, target = parse_key(key)
+    return base, target, date, rate
+
+
+class SQLiteRateStore:
+    def __init__(self, path, flush_every=25, migrate_from=None):
+        self.path = path
+        self.flush_every = flush_every
+        self._dirty = {}
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+        if migrate_from and os.path.exists(migrate_from) and self._is_empty():
+            self.migrate_from_json(migrate_from)
+        atexit.register(self.flush)
+
+    def _is_empty(self):
+        return self._conn.execute("SELECT 1 FROM rates LIMIT 1").fetchone() is None
+
+    def migrate_from_json(self, json_path):
+        # One-off import of the legacy fx_cache.json layout
+        with open(json_path, "r") as f:
+            cache = json.load(f)
+        rows = [_row(key, rate) for key, rate in cache.items()]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rates (base, target, date, rate) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._dirty:
+                return self._dirty[key]
+            date, base, target = parse_key(key)
+            row = self._conn.execute(
+                "SELECT rate FROM rates WHERE base = ? AND target = ? AND date = ?",
+                (base, target, date),
+            ).fetchone()
+        return row[0] if row else default
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def put(self, key, rate):
+        with self._lock:
+            self._dirty[key] = rate
+            if len(self._dirty) >= self.flush_every:
+                self.flush()
+
+    def put_many(self, rates):
+        # Batch write-back, e.g. after a concurrent history fetch
+        with self._lock:
+            self._dirty.update(rates)
+            self.flush()
+
+    def get_range(self, base, target, start=None, end=None):
+        self.flush()
+        with self._lock:
+            return self._conn.execute(
+                "SELECT date, rate FROM rates WHERE base = ? AND target = ? "
+                "AND date >= ? AND date <= ? ORDER BY date",
+                (base, target, start or "0000-00-00", end or "9999-99-99"),
+            ).fetchall()
+
+    def snapshot(self):
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute("SELECT base, target, date, rate FROM rates").fetchall()
+        return {make_key(date, base, target): rate for base, target, date, rate in rows}
+
+    def replace(self, rates):
+        # Whole-cache overwrite, kept for the legacy save_cache() API.
+        # Delete and insert commit together, even when `rates` is empty.
+        with self._lock:
+            self._dirty = {}
+            self._conn.execute("DELETE FROM rates")
+            self._conn.executemany(
+                "INSERT INTO rates (base, target, date, rate) VALUES (?, ?, ?, ?)",
+                [_row(key, rate) for key, rate in rates.items()],
+            )
+            self._conn.commit()
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            rows = [_row(key, rate) for key, rate in self._dirty.items()]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO rates (base, target, date, rate) VALUES (?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+            self._dirty = {}
@@ -0,0 +1,225 @@
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-process use only
+    fcntl = None
+
+# ===============================
+# IN-PROCESS RATE STORE
+# ===============================
+# Loads the cache once per process and serves lookups from memory. New
+# rates are held as dirty entries and written back in batches
+# (write-behind): when enough pile up, on flush(), and at interpreter exit.
+#
+# On disk the cache is a compacted snapshot (fx_cache.json) plus an
+# append-only journal (fx_cache.json.journal, one JSON [key, rate] per
+# line). Flushing appends only the new entries; once the journal grows
+# past `compact_after` lines it is folded into a fresh snapshot that
+# replaces the old one by atomic rename. Every file operation holds an
+# advisory lock on fx_cache.json.lock, so the REPL, eval.py and backfill
+# workers can share one cache.
+
+
+@contextmanager
+def file_lock(lock_path, exclusive):
+    # Advisory lock shared by every process using the same lock file
+    if fcntl is None:
+        yield
+        return
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def make_key(date, base, target):
+    return f"{date}_{base}_{target}"
+
+
+def parse_key(key):
+    # "2026-01-06_inr_aud" -> ("2026-01-06", "inr", "aud")
+    date, base, target = key.split("_")
+    return date, base, target
+
+
+class RateStore:
+    def __init__(self, path, flush_every=25, compact_after=1000):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.lock_path = path + ".lock"
+        self.flush_every = flush_every
+        self.compact_after = compact_after
+        self._rates = None
+        self._dirty = {}
+        self._journal_offset = 0
+        self._journal_lines = 0
+        self._snapshot_mtime = None
+        self._lock = threading.RLock()
+        atexit.register(self.flush)
+
+    def _file_lock(self, exclusive):
+        return file_lock(self.lock_path, exclusive)
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _read_snapshot(self):
+        try:
+            with open(self.path, "r") as f:
+                self._rates = json.load(f)
+        except Exception:
+            self._rates = {}
+        self._snapshot_mtime = self._mtime()
+        self._journal_offset = 0
+        self._journal_lines = 0
+
+    def _replay_journal(self):
+        # Apply entries appended (by any process) since we last looked
+        try:
+            with open(self.journal_path, "rb") as f:
+                f.seek(self._journal_offset)
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break  # torn write from a crash; ignore the tail
+                    self._journal_offset += len(line)
+                    try:
+                        key, rate = json.loads(line)
+                    except ValueError:
+                        continue
+                    self._rates[key] = rate
+                    self._journal_lines += 1
+        except FileNotFoundError:
+            pass
+
+    def _sync(self):
+        # Caller holds the file lock. A new snapshot (another process
+        # compacted) or a shorter journal means we must start over.
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            journal_size = 0
+        if self._snapshot_mtime != self._mtime() or journal_size < self._journal_offset:
+            self._read_snapshot()
+        self._replay_journal()
+        # Our unflushed entries win over what is on disk
+        self._rates.update(self._dirty)
+
+    def _load(self):
+        if self._rates is None:
+            with self._file_lock(exclusive=False):
+                self._read_snapshot()
+                self._replay_journal()
+        return self._rates
+
+    def refresh(self):
+        # Pick up rates written by other processes
+        with self._lock:
+            self._load()
+            with self._file_lock(exclusive=False):
+                self._sync()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._load().get(key, default)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._load()
+
+    def put(self, key, rate):
+        with self._lock:
+            self._load()[key] = rate
+            self._dirty[key] = rate
+            if len(self._dirty) >= self.flush_every:
+                self.flush()
+
+    def put_many(self, rates):
+        # Batch write-back, e.g. after a concurrent history fetch
+        with self._lock:
+            self._load().update(rates)
+            self._dirty.update(rates)
+            self.flush()
+
+    def get_range(self, base, target, start=None, end=None):
+        """
+        Sorted [(date, rate)] for one pair, dates as "YYYY-MM-DD" strings,
+        inclusive of start/end when given.
+        """
+        with self._lock:
+            rows = []
+            for key, rate in self._load().items():
+                date, key_base, key_target = parse_key(key)
+                if (key_base, key_target) != (base, target):
+                    continue
+                if (start and date < start) or (end and date > end):
+                    continue
+                rows.append((date, rate))
+            return sorted(rows)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._load())
+
+    def _write_snapshot(self):
+        # Caller holds the exclusive file lock
+        tmp_path = f"{self.path}.tmp.{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(self._rates, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        with open(self.journal_path, "w"):
+            pass
+        self._snapshot_mtime = self._mtime()
+        self._journal_offset = 0
+        self._journal_lines = 0
+
+    def replace(self, rates):
+        # Whole-cache overwrite, kept for the legacy save_cache() API
+        with self._lock, self._file_lock(exclusive=True):
+            self._rates = dict(rates)
+            self._dirty = {}
+            self._write_snapshot()
+
+    def compact(self):
+        with self._lock:
+            self._load()
+            with self._file_lock(exclusive=True):
+                self._sync()
+                self._dirty = {}
+                self._write_snapshot()
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._load()
+            with self._file_lock(exclusive=True):
+                self._sync()
+                # Replay stopped at the last complete line; anything past it
+                # is a torn write and must go before we append after it
+                try:
+                    if os.path.getsize(self.journal_path) > self._journal_offset:
+                        os.truncate(self.journal_path, self._journal_offset)
+                except FileNotFoundError:
+                    pass
+                lines = "".join(json.dumps([k, r]) + "\n" for k, r in self._dirty.items())
+                with open(self.journal_path, "a") as f:
+                    f.write(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal_offset += len(lines.encode())
+                self._journal_lines += len(self._dirty)
+                self._dirty = {}
+                if self._journal_lines >= self.compact_after:
+                    self._write_snapshot()
@@ -0,0 +1,176 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from .store import file_lock
+
+# ===============================
+# PER-DATE CURRENCY TABLES
+# ===============================
+# The currency-api returns every target for a base in one document. We keep
+# the whole thing as a float64 array indexed by a shared, append-only list
+# of currency codes (NaN = not quoted), so any later pair on that date,
+# including cross rates through a common base, needs no network I/O.
+# Tables live in memory and, when a directory is given, as one raw
+# "<date>_<base>.f64" file each plus a shared "currencies.json" index.
+# Several processes may share the directory, so the index is only ever
+# extended under an advisory lock, after merging what others appended,
+# and replaced by atomic rename; every process's codes stay a prefix of it.
+
+
+class CurrencyTableCache:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self._codes = []
+        self._index = {}
+        self._tables = {}
+        self._lock = threading.RLock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            with file_lock(self._lock_path(), exclusive=False):
+                self._sync_codes()
+
+    def _index_path(self):
+        return os.path.join(self.directory, "currencies.json")
+
+    def _lock_path(self):
+        return self._index_path() + ".lock"
+
+    def _sync_codes(self):
+        # Pick up codes other processes appended; ours are a prefix of these
+        try:
+            with open(self._index_path(), "r") as f:
+                codes = json.load(f)
+        except FileNotFoundError:
+            return
+        for code in codes[len(self._codes):]:
+            self._add_code(code)
+
+    def _table_path(self, date, base):
+        return os.path.join(self.directory, f"{date}_{base}.f64")
+
+    def _add_code(self, code):
+        self._index[code] = len(self._codes)
+        self._codes.append(code)
+
+    def _encode(self, rates):
+        new_codes = [code for code in rates if code not in self._index]
+        if new_codes and self.directory:
+            # Index only ever grows, so older tables stay valid
+            with file_lock(self._lock_path(), exclusive=True):
+                self._sync_codes()
+                new_codes = [code for code in new_codes if code not in self._index]
+                for code in new_codes:
+                    self._add_code(code)
+                if new_codes:
+                    tmp_path = f"{self._index_path()}.tmp.{os.getpid()}"
+                    with open(tmp_path, "w") as f:
+                        json.dump(self._codes, f)
+                    os.replace(tmp_path, self._index_path())
+        else:
+            for code in new_codes:
+                self._add_code(code)
+
+        table = np.full(len(self._codes), np.nan)
+        for code, rate in rates.items():
+            if isinstance(rate, (int, float)):
+                table[self._index[code]] = rate
+        return table
+
+    def put(self, date, base, rates, persist=True):
+        with self._lock:
+            table = self._encode(rates)
+            self._tables[(date, base)] = table
+            if persist and self.directory:
+                # Atomic rename, so a concurrent get_table never reads half a table
+                path = self._table_path(date, base)
+                tmp_path = f"{path}.tmp.{os.getpid()}"
+                table.tofile(tmp_path)
+                os.replace(tmp_path, path)
+
+    def get_table(self, date, base):
+        with self._lock:
+            table = self._tables.get((date, base))
+            if table is None and self.directory:
+                path = self._table_path(date, base)
+                if os.path.exists(path):
+                    table = np.fromfile(path, dtype=np.float64)
+                    self._tables[(date, base)] = table
+            return table
+
+    def _lookup(self, table, code):
+        if len(table) > len(self._codes) and self.directory:
+            # Written by a process that knew more codes than we do
+            with file_lock(self._lock_path(), exclusive=False):
+                self._sync_codes()
+        i = self._index.get(code)
+        if i is None or i >= len(table) or np.isnan(table[i]):
+            return None
+        return float(table[i])
+
+    def _bases_for(self, date):
+        bases = {b for (d, b) in self._tables if d == date}
+        if self.directory:
+            prefix = f"{date}_"
+            bases.update(
+                name[len(prefix):-len(".f64")]
+                for name in os.listdir(self.directory)
+                if name.startswith(prefix) and name.endswith(".f64")
+            )
+        return bases
+
+    def rate(self, date, base, target):
+        """
+        base -> target on `date` from cached tables, or None. Falls back to a
+        cross rate through any other base quoted on the same date.
+        """
+        with self._lock:
+            table = self.get_table(date, base)
+            if table is not None:
+                return self._lookup(table, target)
+
+            for via in self._bases_for(date):
+                table = self.get_table(date, via)
+                base_rate = self._lookup(table, base)
+                target_rate = self._lookup(table, target)
+                if base_rate and target_rate is not None:
+                    # Both quoted per 1 unit of `via`
+                    return target_rate / base_rate
+            return None
+
+    def rates_for(self, date, pairs):
+        """
+        rate() for many (base, target) pairs on one date at once, as an array
+        (NaN = unanswerable): a direct lookup when `base` has a table, else a
+        cross rate through the first cached base quoting both currencies.
+        """
+        with self._lock:
+            bases = sorted(self._bases_for(date))
+            out = np.full(len(pairs), np.nan)
+            if not bases:
+                return out
+            loaded = [self.get_table(date, b) for b in bases]
+            if self.directory and max(len(t) for t in loaded) > len(self._codes):
+                with file_lock(self._lock_path(), exclusive=False):
+                    self._sync_codes()
+
+            # One row per cached base plus a trailing all-NaN row and column,
+            # so an unknown base or code (index -1) reads as missing
+            stacked = np.full((len(bases) + 1, len(self._codes) + 1), np.nan)
+            for i, table in enumerate(loaded):
+                stacked[i, : len(table)] = table
+            row_of = {b: i for i, b in enumerate(bases)}
+            rows = np.array([row_of.get(base, -1) for base, _ in pairs])
+            base_idx = np.array([self._index.get(base, -1) for base, _ in pairs])
+            target_idx = np.array([self._index.get(target, -1) for _, target in pairs])
+
+            direct = stacked[rows, target_idx]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cross = stacked[:, target_idx] / stacked[:, base_idx]
+            valid = np.isfinite(cross) & (cross > 0)
+            first = valid.argmax(axis=0)
+            cross = np.where(valid.any(axis=0), cross[first, np.arange(len(pairs))], np.nan)
+            out[:] = np.where(np.isnan(direct), cross, direct)
+            return out
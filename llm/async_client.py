@@ -0,0 +1,191 @@
+import asyncio
+import os
+import random
+import time
+from collections import deque
+
+from mistralai import Mistral
+from openai import AsyncOpenAI
+
+from llm.client import MISTRAL_API_KEY, OPENROUTER_API_KEY, cache_key, response_cache
+from pricing import estimate_model_cost
+
+# ===============================
+# ASYNC CLIENT WITH HEDGING
+# ===============================
+# chat_with_fallback only tries Mistral after OpenRouter has failed and a
+# 1-2 s back-off, so a slow primary costs timeout + sleep + secondary. With
+# hedging, if OpenRouter has not answered after `hedge_delay` seconds
+# (by default the p90 of its recent latencies) Mistral is asked as well;
+# the first successful reply wins and the other request is cancelled.
+# A primary error starts the secondary at once, without the back-off.
+#
+# The loser may still be billed. When it finished before we could cancel
+# it, its real usage is counted as wasted; when cancelled mid-flight we
+# count the winner's prompt tokens, since the provider has at least read
+# the same prompt.
+#
+# The async SDK clients keep an httpx pool bound to the event loop that
+# created them, so each call opens its own pair and closes them on exit;
+# a module-level client breaks on the second asyncio.run().
+
+PRIMARY_MODEL = "stepfun/step-3.5-flash:free"
+SECONDARY_MODEL = "mistral-small-latest"
+HEDGE_QUANTILE = 0.9
+DEFAULT_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "4.0"))  # until we have latencies
+MIN_LATENCY_SAMPLES = 10
+
+_primary_latencies = deque(maxlen=200)
+_stats = {
+    "requests": 0,
+    "hedged": 0,
+    "primary_wins": 0,
+    "secondary_wins": 0,
+    "failures": 0,
+    "wasted_input_tokens": 0,
+    "wasted_output_tokens": 0,
+    "wasted_cost": 0.0,
+}
+
+
+def hedge_delay_estimate(quantile=HEDGE_QUANTILE):
+    # Seconds to wait before hedging: a quantile of recent primary latencies
+    if len(_primary_latencies) < MIN_LATENCY_SAMPLES:
+        return DEFAULT_HEDGE_DELAY
+    ordered = sorted(_primary_latencies)
+    return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+def hedge_stats():
+    stats = dict(_stats)
+    stats["hedge_delay"] = hedge_delay_estimate()
+    return stats
+
+
+def _usage(usage):
+    return {
+        "input": usage.prompt_tokens,
+        "output": usage.completion_tokens,
+        "total": usage.total_tokens,
+    }
+
+
+async def _ask_primary(openrouter, messages, model, **params):
+    start = time.time()
+    try:
+        response = await openrouter.chat.completions.create(model=model, messages=messages, **params)
+    except asyncio.CancelledError:
+        # Lost a hedge: the elapsed time is a lower bound, but leaving it
+        # out would bias the delay towards the fast requests
+        _primary_latencies.append(time.time() - start)
+        raise
+    latency = time.time() - start
+    _primary_latencies.append(latency)
+    return {
+        "content": response.choices[0].message.content,
+        "tokens": _usage(response.usage),
+        "latency": latency,
+        "model": model,
+    }
+
+
+async def _ask_secondary(mistral, messages, **params):
+    start = time.time()
+    res = await mistral.chat.complete_async(model=SECONDARY_MODEL, messages=messages, **params)
+    return {
+        "content": res.choices[0].message.content,
+        "tokens": _usage(res.usage),
+        "latency": time.time() - start,
+        "model": SECONDARY_MODEL,
+    }
+
+
+def _record_waste(loser, winner):
+    if loser.cancelled():
+        tokens = {"input": winner["tokens"]["input"], "output": 0}
+        model = PRIMARY_MODEL if winner["model"] == SECONDARY_MODEL else SECONDARY_MODEL
+    elif loser.exception() is None:
+        wasted = loser.result()
+        tokens, model = wasted["tokens"], wasted["model"]
+    else:
+        return  # a failed request is not hedging overhead
+    _stats["wasted_input_tokens"] += tokens["input"]
+    _stats["wasted_output_tokens"] += tokens["output"]
+    _stats["wasted_cost"] += estimate_model_cost(model, tokens["input"], tokens["output"])
+
+
+async def _race(clients, messages, model_primary, hedge, hedge_delay, **params):
+    openrouter, mistral = clients
+    start = time.time()
+    primary = asyncio.ensure_future(_ask_primary(openrouter, messages, model_primary, **params))
+    delay = hedge_delay_estimate() if hedge_delay is None else hedge_delay
+    await asyncio.wait({primary}, timeout=delay if hedge else None)
+
+    error = None
+    if primary.done():
+        error = primary.exception()
+        if error is None:
+            _stats["primary_wins"] += 1
+            return primary.result()
+        print("⚠️ OpenRouter failed, falling back to Mistral:", error)
+        if not hedge:
+            # Same back-off as chat_with_fallback
+            await asyncio.sleep(1 + random.random())
+    else:
+        _stats["hedged"] += 1
+
+    secondary = asyncio.ensure_future(_ask_secondary(mistral, messages, **params))
+    pending = {secondary} if primary.done() else {primary, secondary}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                    continue
+                winner = task.result()
+                loser = secondary if task is primary else primary
+                if not loser.done():
+                    loser.cancel()
+                    await asyncio.gather(loser, return_exceptions=True)
+                _record_waste(loser, winner)
+                _stats["primary_wins" if task is primary else "secondary_wins"] += 1
+                winner["latency"] = time.time() - start
+                return winner
+    finally:
+        for task in (primary, secondary):
+            if not task.done():
+                task.cancel()
+
+    _stats["failures"] += 1
+    raise error
+
+
+async def achat_with_fallback(
+    messages, model_primary=PRIMARY_MODEL, hedge=True, hedge_delay=None, use_cache=True, **params
+):
+    """
+    Async counterpart of chat_with_fallback, sharing its response cache.
+    hedge=False keeps the serial fallback; hedge_delay overrides the
+    latency-based delay in seconds.
+    """
+    _stats["requests"] += 1
+    key = cache_key(messages, model_primary, params)
+    if use_cache:
+        cached = response_cache.get(key)
+        if cached is not None:
+            return dict(cached, tokens={"input": 0, "output": 0, "total": 0}, latency=0.0, cached=True)
+
+    async with AsyncOpenAI(
+        base_url="https://openrouter.ai/api/v1",
+        api_key=OPENROUTER_API_KEY,
+    ) as openrouter, Mistral(api_key=MISTRAL_API_KEY) as mistral:
+        response = await _race((openrouter, mistral), messages, model_primary, hedge, hedge_delay, **params)
+    if use_cache and response["content"]:
+        response_cache.put(key, response)
+    return dict(response, cached=False)
+
+
+def chat_hedged(messages, **kwargs):
+    # Blocking wrapper for synchronous callers
+    return asyncio.run(achat_with_fallback(messages, **kwargs))
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ===============================
+# LLM RESPONSE CACHE
+# ===============================
+# Content-addressed: the key is a SHA-256 of the normalized messages, the
+# requested model and any sampling parameters, so identical prompts (intent
+# classification, explanations of unchanged fx numbers) are served without
+# another paid round trip. Two tiers: a small in-memory LRU in front of
+# one JSON file per key on disk. Entries expire after `ttl` seconds; each
+# tier is trimmed to its size limit, least recently used first.
+
+CACHE_DIR = os.getenv("LLM_CACHE_DIR", "llm_cache")
+CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+MEMORY_ENTRIES = 256
+DISK_ENTRIES = 5000
+
+
+def _normalize(text):
+    return " ".join(str(text).split())
+
+
+def cache_key(messages, model, params=None):
+    payload = {
+        "messages": [
+            {"role": m.get("role"), "content": _normalize(m.get("content", ""))} for m in messages
+        ],
+        "model": model,
+        "params": params or {},
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL, memory_entries=MEMORY_ENTRIES, disk_entries=DISK_ENTRIES):
+        self.directory = directory
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self._memory = OrderedDict()  # key -> (stored_at, response)
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "stores": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _fresh(self, stored_at):
+        return self.ttl is None or time.time() - stored_at < self.ttl
+
+    def _remember(self, key, stored_at, response):
+        # Caller holds the lock
+        self._memory[key] = (stored_at, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            return entry["stored_at"], entry["response"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def get(self, key):
+        with self._lock:
+            expired = False
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._fresh(entry[0]):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+                expired = True
+
+            entry = self._read_disk(key) if self.directory else None
+            if entry is not None:
+                if self._fresh(entry[0]):
+                    os.utime(self._path(key))  # disk LRU order follows mtime
+                    self._remember(key, *entry)
+                    self._stats["disk_hits"] += 1
+                    return entry[1]
+                self._discard(key)
+                expired = True
+
+            self._stats["misses"] += 1
+            self._stats["expired"] += expired
+            return None
+
+    def put(self, key, response):
+        with self._lock:
+            stored_at = time.time()
+            self._remember(key, stored_at, response)
+            self._stats["stores"] += 1
+            if not self.directory:
+                return
+            tmp_path = f"{self._path(key)}.tmp.{os.getpid()}"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "response": response}, f)
+            os.replace(tmp_path, self._path(key))
+            self._trim_disk()
+
+    def _discard(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _trim_disk(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    entries.append((os.stat(os.path.join(self.directory, name)).st_mtime, name))
+                except FileNotFoundError:
+                    continue
+        if len(entries) <= self.disk_entries:
+            return
+        entries.sort()
+        for _, name in entries[: len(entries) - self.disk_entries]:
+            self._discard(name[: -len(".json")])
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self.directory:
+                for name in os.listdir(self.directory):
+                    if name.endswith(".json"):
+                        self._discard(name[: -len(".json")])
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_size"] = len(self._memory)
+            lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+            stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+            return stats
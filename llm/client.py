@@ -5,6 +5,8 @@ from mistralai import Mistral
 import os
 from dotenv import load_dotenv
 
+from llm.cache import ResponseCache, cache_key
+
 # --LLM Part--
 load_dotenv()
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
@@ -28,18 +30,75 @@ mistral = Mistral(  # secondary
     api_key=os.getenv("MISTRAL_API_KEY", "")
 )
 
+response_cache = ResponseCache()
+
+
+def cache_stats():
+    return response_cache.stats()
+
+
 # ===============================
 # 7. Chat with fallback
 # ===============================
 
 
-def chat_with_fallback(messages, model_primary="stepfun/step-3.5-flash:free"):
+def chat_with_fallback(
+    messages, model_primary="stepfun/step-3.5-flash:free", use_cache=True, on_token=None, **params
+):
+    """
+    Extra keyword arguments (temperature, max_tokens, ...) go to whichever
+    provider answers and are part of the cache key. Pass use_cache=False
+    when the answer must be fresh. With on_token, the reply is streamed:
+    on_token(text) is called for each chunk as it arrives and the result
+    also carries "ttft" (seconds to the first chunk).
+    """
+    if on_token is None:
+        call = lambda: _chat_uncached(messages, model_primary, **params)
+    else:
+        call = lambda: _drain(stream_chat(messages, model_primary, **params), on_token)
+
+    if not use_cache:
+        return dict(call(), cached=False)
+
+    start = time.time()
+    key = cache_key(messages, model_primary, params)
+    cached = response_cache.get(key)
+    if cached is not None:
+        latency = time.time() - start
+        if on_token is not None:
+            on_token(cached["content"])
+        # Nothing was billed for this answer
+        return dict(
+            cached,
+            tokens={"input": 0, "output": 0, "total": 0},
+            latency=latency,
+            ttft=latency if on_token is not None else None,
+            cached=True,
+        )
+
+    response = call()
+    if response["content"]:
+        response_cache.put(key, {k: v for k, v in response.items() if k != "ttft"})
+    return dict(response, cached=False)
+
+
+def _drain(stream, on_token):
+    # Feeds a stream_chat generator to on_token and returns its summary
+    while True:
+        try:
+            on_token(next(stream))
+        except StopIteration as done:
+            return done.value
+
+
+def _chat_uncached(messages, model_primary, **params):
     try:
         # PRIMARY: OpenRouter
         start = time.time()
         response = openrouter.chat.completions.create(
             model=model_primary,
             messages=messages,
+            **params,
         )
 
         latency = time.time() - start
@@ -66,6 +125,7 @@ def chat_with_fallback(messages, model_primary="stepfun/step-3.5-flash:free"):
             model="mistral-small-latest",
             messages=messages,
             stream=False,
+            **params,
         )
         latency = time.time() - start
         return {
@@ -78,3 +138,87 @@ def chat_with_fallback(messages, model_primary="stepfun/step-3.5-flash:free"):
             "latency": latency,
             "model": "mistral-small-latest",
         }
+
+
+# ===============================
+# Streaming
+# ===============================
+# Both SDKs send the text as deltas and the token usage on the last chunk
+# (OpenRouter only when asked via stream_options).
+
+
+def _usage_tokens(usage):
+    if usage is None:
+        return {"input": 0, "output": 0, "total": 0}
+    return {
+        "input": usage.prompt_tokens,
+        "output": usage.completion_tokens,
+        "total": usage.total_tokens,
+    }
+
+
+def _collect(chunks, model, start):
+    # Yields text deltas; returns the same dict as chat_with_fallback plus ttft
+    parts, usage, ttft = [], None, None
+    for chunk in chunks:
+        if getattr(chunk, "usage", None) is not None:
+            usage = chunk.usage
+        if not chunk.choices:
+            continue
+        text = chunk.choices[0].delta.content
+        if isinstance(text, str) and text:
+            if ttft is None:
+                ttft = time.time() - start
+            parts.append(text)
+            yield text
+    latency = time.time() - start
+    return {
+        "content": "".join(parts),
+        "tokens": _usage_tokens(usage),
+        "latency": latency,
+        "ttft": latency if ttft is None else ttft,
+        "model": model,
+    }
+
+
+def stream_chat(messages, model_primary="stepfun/step-3.5-flash:free", **params):
+    """
+    Generator over reply text chunks; its return value (StopIteration.value)
+    is the usual response dict plus "ttft". Falls back to Mistral only if
+    OpenRouter fails before sending any text.
+    """
+    emitted = False
+    try:
+        # PRIMARY: OpenRouter
+        start = time.time()
+        chunks = openrouter.chat.completions.create(
+            model=model_primary,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **params,
+        )
+        stream = _collect(chunks, model_primary, start)
+        while True:
+            try:
+                text = next(stream)
+            except StopIteration as done:
+                return done.value
+            emitted = True
+            yield text
+
+    except Exception as e:
+        if emitted:
+            raise
+        print("⚠️ OpenRouter failed, falling back to Mistral:", e)
+
+        time.sleep(1 + random.random())
+
+        # FALLBACK: Mistral
+        start = time.time()
+        events = mistral.chat.stream(
+            model="mistral-small-latest",
+            messages=messages,
+            **params,
+        )
+        return (yield from _collect((event.data for event in events), "mistral-small-latest", start))
@@ -1,6 +1,6 @@
 from .client import chat_with_fallback
 
-def generate_fx_explanation(fx_data, scenario, conversation_history):
+def generate_fx_explanation(fx_data, scenario, conversation_history, on_token=None):
     prompt = f"""
 You are a financial assistant helping an international student decide when to send money from INR to AUD.
 
@@ -28,7 +28,7 @@ Keep it concise but intelligent.
         {"role": "user", "content": prompt}
     ]
 
-    response = chat_with_fallback(messages)
+    response = chat_with_fallback(messages, on_token=on_token)
     tokens = response["tokens"]
 
     return {
@@ -37,5 +37,6 @@ Keep it concise but intelligent.
         "output_tokens":tokens["output"],
         "total_tokens":tokens["total"],
         "latency": response.get("latency", 0.0),
+        "ttft": response.get("ttft"),
         "model": response.get("model", "unknown")
     }
\ No newline at end of file
@@ -1,10 +1,10 @@
 from llm.client import chat_with_fallback
 
-def general_llm_chat(conversation_history):
+def general_llm_chat(conversation_history, on_token=None):
     messages=[
             {"role": "system", "content": "You are a helpful assistant that answers general questions."}
         ]+ conversation_history[-6:]
-    response = chat_with_fallback(messages=messages)
+    response = chat_with_fallback(messages=messages, on_token=on_token)
     tokens = response["tokens"]
     return {
         "content":response["content"],
@@ -12,5 +12,6 @@ def general_llm_chat(conversation_history):
         "output_tokens":tokens["output"],
         "total_tokens":tokens["total"],
         "latency":response.get("latency",0.0),
+        "ttft":response.get("ttft"),
         "model":response.get("model","unknown"),
     }
\ No newline at end of file
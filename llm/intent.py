@@ -1,6 +1,174 @@
-from llm.client import chat_with_fallback
+import json
+import os
+import re
+import time
+
+from llm.calc import extract_math_expression
+
+# ===============================
+# LOCAL FAST PATH
+# ===============================
+# Most queries are obviously fx or obviously arithmetic, so we try cheap
+# local tiers before paying for an LLM round trip:
+#   1. regex/keyword rules
+#   2. an optional TF-IDF + logistic regression model trained on the
+#      user_query/intent pairs in logs.jsonl (needs scikit-learn)
+# Each tier returns (intent, confidence); the LLM is only asked when the
+# best local confidence is below LOCAL_CONFIDENCE.
+
+INTENTS = ("fx", "explain", "math")
+LOCAL_CONFIDENCE = float(os.getenv("INTENT_LOCAL_CONFIDENCE", "0.8"))
+INTENT_LOG_FILE = "logs.jsonl"
+MIN_TRAINING_QUERIES = 20
+# Every fx/explain query appends to the log, so refitting on each change
+# would put a full-log fit on the request path; refit at most this often
+MODEL_RETRAIN_SECONDS = float(os.getenv("INTENT_MODEL_RETRAIN_SECONDS", str(24 * 3600)))
+
+_ARITHMETIC = re.compile(r"[\d)]\s*[-+*/^]\s*[(\d.]")
+_MATH_WORDS = {"what", "is", "whats", "calculate", "compute", "evaluate", "solve", "equals", "please"}
+_FX_PATTERNS = [
+    re.compile(p)
+    for p in (
+        r"\bexchange rates?\b",
+        r"\b(forex|fx)\b",
+        r"\bcurrenc(y|ies)\b",
+        r"\bsend (money|funds|aud|inr)\b",
+        r"\b(transfer|remit\w*)\b",
+        r"\b(inr|aud|rupees?|dollars?)\b",
+        r"\bgood time\b",
+        r"\b(india|ind|australia|aus)\b",
+    )
+]
+# Phrases that only ever mean an fx decision here; one is enough to skip the LLM
+_FX_STRONG = re.compile(r"\b(good time|send (money|funds|aud|inr)|exchange rates?|forex)\b")
+_GREETING = re.compile(r"^(hi|hello|hey|thanks|thank you)\b[\s!.?]*$")
+_EXPLAIN_START = re.compile(r"^(explain|define|why|what (is|are)|how (does|do|is)|tell me about|meaning of)\b")
+
+_stats = {"rule": 0, "model": 0, "llm": 0}
+_model = {"mtime": None, "trained_at": None, "pipeline": None}
+
+
+def rule_intent(text):
+    lowered = text.lower().strip()
+
+    expr = extract_math_expression(lowered)
+    if expr and _ARITHMETIC.search(expr):
+        words = set(re.findall(r"[a-z]+", lowered))
+        if not words:
+            return "math", 0.99
+        if words <= _MATH_WORDS:
+            return "math", 0.9
+
+    fx_hits = sum(1 for p in _FX_PATTERNS if p.search(lowered))
+    explain_start = bool(_EXPLAIN_START.match(lowered))
+    if fx_hits:
+        if explain_start:
+            return "fx", 0.6  # "what is an exchange rate" could go either way
+        if fx_hits >= 2:
+            return "fx", 0.9
+        return "fx", 0.85 if _FX_STRONG.search(lowered) else 0.75
+
+    if _GREETING.match(lowered):
+        return "explain", 0.9
+    if explain_start:
+        return "explain", 0.8
+    return None, 0.0
+
+
+def _training_pairs(log_file):
+    queries, intents = [], []
+    seen = set()
+    with open(log_file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            query, intent = entry.get("user_query"), entry.get("intent")
+            if not query or intent not in INTENTS:
+                continue
+            key = (query.strip().lower(), intent)
+            if key not in seen:
+                seen.add(key)
+                queries.append(key[0])
+                intents.append(intent)
+    return queries, intents
+
+
+def train_intent_model(log_file=INTENT_LOG_FILE):
+    """
+    Fits TF-IDF + logistic regression on logged queries. Returns None when
+    scikit-learn is missing or the log has too little (or one-class) data.
+    """
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+    except ImportError:
+        return None
+
+    try:
+        queries, intents = _training_pairs(log_file)
+    except FileNotFoundError:
+        return None
+    if len(queries) < MIN_TRAINING_QUERIES or len(set(intents)) < 2:
+        return None
+
+    pipeline = make_pipeline(
+        TfidfVectorizer(analyzer="char_wb", ngram_range=(2, 4), sublinear_tf=True),
+        LogisticRegression(max_iter=1000),
+    )
+    pipeline.fit(queries, intents)
+    return pipeline
+
+
+def model_intent(text, log_file=INTENT_LOG_FILE):
+    # Fits on first use, then again only once the log has changed and
+    # MODEL_RETRAIN_SECONDS have passed since the last fit
+    try:
+        mtime = os.stat(log_file).st_mtime_ns
+    except FileNotFoundError:
+        return None, 0.0
+    trained_at = _model["trained_at"]
+    stale = trained_at is None or (
+        _model["mtime"] != mtime and time.time() - trained_at >= MODEL_RETRAIN_SECONDS
+    )
+    if stale:
+        _model["pipeline"] = train_intent_model(log_file)
+        _model["mtime"] = mtime
+        _model["trained_at"] = time.time()
+
+    pipeline = _model["pipeline"]
+    if pipeline is None:
+        return None, 0.0
+    probs = pipeline.predict_proba([text.lower().strip()])[0]
+    best = probs.argmax()
+    return pipeline.classes_[best], float(probs[best])
+
+
+def classify_local(user_input, threshold=LOCAL_CONFIDENCE):
+    intent, confidence = rule_intent(user_input)
+    source = "rule"
+    if confidence < threshold:
+        model_guess, model_confidence = model_intent(user_input)
+        if model_confidence > confidence:
+            intent, confidence, source = model_guess, model_confidence, "model"
+    return {"intent": intent, "confidence": confidence, "source": source}
+
+
+def intent_stats():
+    # How often each tier answered
+    return dict(_stats)
+
+
+# ===============================
+# LLM CLASSIFIER
+# ===============================
+
+
+def _llm_intent(user_input):
+    from llm.client import chat_with_fallback
 
-def classify_intent(user_input):
     prompt = f"""You are an intent classification model. Classify the user's intent into one of the following categories based on the query:
 1. fx - related to foreign exchange decisions
 2. explain - asking for an explanation of a concept 
@@ -19,7 +187,25 @@ User query: "{user_input}"
     )
 
     intent = response["content"].strip().lower()
-    if intent not in ["fx", "explain", "math"]:
+    if intent not in INTENTS:
         return "unknown"
     return intent
 
+
+def classify_intent_scored(user_input, threshold=None):
+    """
+    {"intent", "confidence", "source"} where source is rule, model or llm.
+    The LLM gives no score, so its answers carry confidence None.
+    """
+    threshold = LOCAL_CONFIDENCE if threshold is None else threshold
+    local = classify_local(user_input, threshold)
+    if local["intent"] is not None and local["confidence"] >= threshold:
+        _stats[local["source"]] += 1
+        return local
+
+    _stats["llm"] += 1
+    return {"intent": _llm_intent(user_input), "confidence": None, "source": "llm"}
+
+
+def classify_intent(user_input):
+    return classify_intent_scored(user_input)["intent"]
@@ -21,6 +21,7 @@ def log_event(
     model_used: str,
     predicted_rate: float = None,
     predicted_direction: str = None,
+    ttft: float = None,
 ):
     """
     Writes a structured JSON log entry to logs.jsonl
@@ -46,6 +47,9 @@ def log_event(
         log_entry["predicted_rate"] = round(predicted_rate, 4)
     if predicted_direction is not None:
         log_entry["predicted_direction"] = predicted_direction
+    # Time to first token, only for streamed replies
+    if ttft is not None:
+        log_entry["ttft"] = round(ttft, 3)
 
     with LOG_FILE.open("a", encoding="utf-8") as f:
         f.write(json.dumps(log_entry) + "\n")
@@ -5,12 +5,25 @@ conversation_history = []
 if __name__ == "__main__":
     print("Welcome!")
     print("Type 'exit' to quit.")
-    
+
     while True:
         user_input = input("\nEnter your query: ")
         if user_input.lower() == "exit":
             print("Goodbye!")
             break
-        
-        response = orchestrator(user_input, conversation_history)
-        print("\nAssistant:", response)
\ No newline at end of file
+
+        # LLM replies are printed as they stream in; math and fallback
+        # answers arrive whole and are printed afterwards
+        streamed = []
+
+        def print_token(text):
+            if not streamed:
+                print("\nAssistant: ", end="", flush=True)
+            streamed.append(text)
+            print(text, end="", flush=True)
+
+        response = orchestrator(user_input, conversation_history, on_token=print_token)
+        if streamed:
+            print()
+        else:
+            print("\nAssistant:", response)
@@ -23,7 +23,7 @@ def extract_expression(text):
 
 
 
-def orchestrator(user_input: str, conversation_history):
+def orchestrator(user_input: str, conversation_history, on_token=None):
     conversation_history.append({
         "role":"user",
         "content":user_input
@@ -38,11 +38,11 @@ def orchestrator(user_input: str, conversation_history):
 
     if intent == "math":
         try: 
-            result = safe_eval(user_input)
-            final_response = f"The result of '{user_input} is: {result}'"
-            # return f"The result of '{user_input}' is: {result}"
+            # The fast path routes "what is 2+2" here, so evaluate only the arithmetic
+            result = safe_eval(extract_math_expression(user_input) or user_input)
         except Exception as e:
             return f"Sorry, I couldn't evaluate that expression. Please make sure it's a valid mathematical expression. Error: {str(e)}"
+        return f"The result of '{user_input}' is: {result}"
         
 
     # ------------
@@ -52,7 +52,7 @@ def orchestrator(user_input: str, conversation_history):
     if intent == "fx":
         fx_data = run_fx_pipeline()
 
-        llm_response = generate_fx_explanation(fx_data, fx_data["scenario"], conversation_history)
+        llm_response = generate_fx_explanation(fx_data, fx_data["scenario"], conversation_history, on_token=on_token)
 
         final_response = llm_response["content"]
 
@@ -83,6 +83,7 @@ def orchestrator(user_input: str, conversation_history):
             total_tokens=total_tokens,
             cost_estimate=cost_estimate,
             latency=llm_response["latency"],
+            ttft=llm_response["ttft"],
             model_used=llm_response["model"],
             predicted_rate=predicted_rate,
             predicted_direction=predicted_direction,
@@ -95,7 +96,7 @@ def orchestrator(user_input: str, conversation_history):
     # ------------
 
     elif intent == "explain":
-        llm_response = general_llm_chat(conversation_history)
+        llm_response = general_llm_chat(conversation_history, on_token=on_token)
         final_response = llm_response["content"]
 
         input_tokens = llm_response["input_tokens"]
@@ -120,6 +121,7 @@ def orchestrator(user_input: str, conversation_history):
             total_tokens=total_tokens,
             cost_estimate=cost_estimate,
             latency=llm_response["latency"],
+            ttft=llm_response["ttft"],
             model_used=llm_response["model"],
         )
 
@@ -0,0 +1,12 @@
+import pytest
+
+from fx.analysis import analyze_fx
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"method": "antithetic"}, {"simulations": 5000}, {"seed": 7}, {"workers": 4}],
+)
+def test_analytic_engine_rejects_simulation_options(options):
+    with pytest.raises(ValueError, match="analytic"):
+        analyze_fx(engine="analytic", **options)
@@ -0,0 +1,118 @@
+import datetime
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import fx.data as data
+from fx.http import CircuitBreaker
+from fx.store import RateStore, make_key
+from fx.tables import CurrencyTableCache
+
+# Local stand-in for the jsdelivr layout:
+#   /npm/@fawazahmed0/currency-api@<date>/v1/currencies/<base>.json
+PATH_RE = re.compile(r"@([^/]+)/v1/currencies/(\w+)\.json$")
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(0.05)  # long enough for requests to overlap
+            match = PATH_RE.search(self.path)
+            if not match:
+                self.send_response(404)
+                self.end_headers()
+                return
+            date, base = match.groups()
+            body = json.dumps({"date": date, base: {"aud": 0.018, "usd": 0.012}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    server = StubServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+
+    monkeypatch.setattr(
+        data, "PRIMARY_URL", host + "/npm/@fawazahmed0/currency-api@{date}/{api_version}/currencies/{base}.json"
+    )
+    monkeypatch.setattr(data, "FALLBACK_URL", host + "/missing/{date}/{api_version}/{base}.json")
+    monkeypatch.setattr(data, "MAX_CONNECTIONS_PER_HOST", 2)
+    monkeypatch.setattr(data, "_host_slots", {})
+    monkeypatch.setattr(
+        data, "_breakers", {"primary": CircuitBreaker("primary"), "fallback": CircuitBreaker("fallback")}
+    )
+    monkeypatch.setattr(data, "_store", RateStore(str(tmp_path / "fx_cache.json")))
+    monkeypatch.setattr(data, "_tables", CurrencyTableCache())
+    monkeypatch.setattr(data, "open_series", lambda base, target: None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_cold_history_fetch(stub, monkeypatch):
+    days = 12
+    today = datetime.datetime.now()
+    dates = [(today - datetime.timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days, 0, -1)]
+    cached = dates[::3]
+
+    store = data.get_store()
+    store.put_many({make_key(d, "inr", "aud"): 0.017 for d in cached})
+
+    batches = []
+    put_many = store.put_many
+    monkeypatch.setattr(store, "put_many", lambda rates: (batches.append(dict(rates)), put_many(rates)))
+    monkeypatch.setattr(store, "put", lambda *args: pytest.fail("history should not write one rate at a time"))
+
+    rates = data.get_historical_rates("inr", "aud", days=days)
+
+    missing = [d for d in dates if d not in cached]
+    fetched = sorted(PATH_RE.search(path).group(1) for path in stub.requests)
+    assert fetched == missing
+    assert 1 < stub.max_in_flight <= data.MAX_CONNECTIONS_PER_HOST
+    assert batches == [{make_key(d, "inr", "aud"): 0.018 for d in missing}]
+    assert rates == [0.017 if d in cached else 0.018 for d in dates]
+
+
+def test_history_matrix_fetches_one_table_per_date(stub):
+    days = 10
+    pairs = [("inr", "aud"), ("inr", "usd"), ("aud", "usd")]
+
+    dates, matrix = data.get_historical_matrix(pairs, days=days)
+
+    # The inr tables answer aud:usd as a cross rate, so no aud table is fetched
+    fetched = sorted(PATH_RE.search(path).groups() for path in stub.requests)
+    assert fetched == sorted((d, "inr") for d in dates)
+    assert matrix[0] == pytest.approx([0.018] * days)
+    assert matrix[1] == pytest.approx([0.012] * days)
+    assert matrix[2] == pytest.approx([0.012 / 0.018] * days)
@@ -0,0 +1,52 @@
+import pytest
+
+from llm.intent import LOCAL_CONFIDENCE, rule_intent
+
+# Distinct (user_query, intent) pairs from logs.jsonl, as labelled by the LLM
+LOGGED_QUERIES = [
+    ("Is now a good time to send money to Australia from India?", "fx"),
+    ("Is now a good time?", "fx"),
+    ("Test prediction", "fx"),
+    ("hi", "explain"),
+    ("shall i send aud ", "fx"),
+    ("exit ", "fx"),
+    ("good time to send money to aus from ind?", "fx"),
+    ("should i send money now from ind to aus", "fx"),
+    ("are you sure?", "explain"),
+    ("hello ", "explain"),
+    ("shall i send money from ind to aud now", "fx"),
+    ("so no point waiting?", "fx"),
+    ("how is the economy in India today?", "explain"),
+]
+
+# Queries the rules must settle without the LLM
+LOCAL_QUERIES = [
+    "Is now a good time to send money to Australia from India?",
+    "Is now a good time?",
+    "hi",
+    "shall i send aud ",
+    "good time to send money to aus from ind?",
+    "should i send money now from ind to aus",
+    "hello ",
+    "shall i send money from ind to aud now",
+]
+
+
+@pytest.mark.parametrize("query,logged", LOGGED_QUERIES)
+def test_confident_rules_agree_with_logged_intent(query, logged):
+    intent, confidence = rule_intent(query)
+    if confidence >= LOCAL_CONFIDENCE:
+        assert intent == logged
+
+
+@pytest.mark.parametrize("query", LOCAL_QUERIES)
+def test_common_queries_skip_the_llm(query):
+    _, confidence = rule_intent(query)
+    assert confidence >= LOCAL_CONFIDENCE
+
+
+@pytest.mark.parametrize("query", ["2+2", "what is 12*3"])
+def test_arithmetic_is_math(query):
+    intent, confidence = rule_intent(query)
+    assert intent == "math"
+    assert confidence >= LOCAL_CONFIDENCE
@@ -0,0 +1,25 @@
+import sqlite3
+
+from fx.sqlite_store import SQLiteRateStore
+
+
+def _count(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM rates").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_replace_commits_even_when_empty(tmp_path):
+    path = str(tmp_path / "fx_cache.sqlite")
+    store = SQLiteRateStore(path)
+    store.put_many({f"2024-01-{d:02d}_inr_aud": 0.018 for d in range(1, 11)})
+    assert _count(path) == 10
+
+    store.replace({})
+    assert store.snapshot() == {}
+    assert _count(path) == 0
+
+    store.replace({"2024-02-01_inr_aud": 0.019})
+    assert _count(path) == 1
@@ -0,0 +1,21 @@
+from fx.store import RateStore
+
+
+def test_flush_after_torn_journal_tail(tmp_path):
+    path = str(tmp_path / "fx_cache.json")
+    store = RateStore(path)
+    store.put_many({"2024-01-01_inr_aud": 0.1})
+
+    # Simulate a crash mid-append
+    with open(store.journal_path, "a") as f:
+        f.write('["2024-01-02_inr_aud", 0.')
+
+    store = RateStore(path)
+    store.put("2024-01-02_inr_aud", 0.2)
+    store.put("2024-01-03_inr_aud", 0.3)
+    store.flush()
+
+    reloaded = RateStore(path)
+    assert reloaded.get("2024-01-01_inr_aud") == 0.1
+    assert reloaded.get("2024-01-02_inr_aud") == 0.2
+    assert reloaded.get("2024-01-03_inr_aud") == 0.3